@@ -1,25 +1,61 @@
-from itertools import combinations
+import gc
+from pathlib import Path
 from pprint import pprint
+import sys
 from typing import Any, Hashable, Sequence
 
+# Making the sibling modules importable wherever this script runs from...
+if str(Path(__file__).resolve().parent) not in sys.path:
+    sys.path.append(str(Path(__file__).resolve().parent))
+
+from bitmap_set import BitmapSet
+
 
 def AreMutuallyDisjoint(__sets: Sequence[set], /) -> bool:
     """Checks a sequence of sets are mutually disjoint or not. If the
     sequence contains one element or it is empty, the result is always
-    True.
+    True. The sets are streamed into one set of seen elements and the
+    check stops at the first set which meets it, so it runs in O(total
+    size) instead of intersecting every pair. If all sets are `BitmapSet`
+    objects, the seen elements are a `BitmapSet` too, so the check runs
+    container by container.
     """
-    if len(__sets) < 1:
-        return True
-    for i, j in combinations(range(len(__sets)), 2):
-        if __sets[i] & __sets[j]:
+    seen: set[Any] | BitmapSet
+    if __sets and all(isinstance(set_, BitmapSet) for set_ in __sets):
+        seen = BitmapSet()
+    else:
+        seen = set()
+    for set_ in __sets:
+        if not seen.isdisjoint(set_):
             return False
+        seen.update(set_)
     return True
 
 
+def FindCollidingPair(__sets: Sequence[set], /) -> tuple[int, int] | None:
+    """Returns the indices `(i, j)` of the first pair of sets of the
+    sequence that have a common element, where `j` is the least such
+    index and `i` the least index of a set that `j` meets, or `None` if
+    the sets are mutually disjoint. Like `AreMutuallyDisjoint`, it runs
+    in a single pass, keeping the index of the set in which every element
+    was seen.
+    """
+    owners: dict[Any, int] = {}
+    for j, set_ in enumerate(__sets):
+        common = owners.keys() & set_
+        if common:
+            return min(owners[elem] for elem in common), j
+        owners.update(dict.fromkeys(set_, j))
+    return None
+
+
 def GetAllIntersections(
-        __sets: dict[Hashable, set[Any]],
-        /
-        ) -> dict[frozenset[Hashable], set[Any]]:
+        __sets: dict[Hashable, set[Any]] | dict[Hashable, BitmapSet],
+        /,
+        *,
+        bitmask: bool = False,
+        countOnly: bool = False,
+        ) -> dict[frozenset[Hashable] | int, set[Any] | BitmapSet | int]:
     """Gets all possible intersections of a collection of sets. The input
     consists of a mapping between sets' identity (Hashable objects) and their
     objects (set). The output is made of a mapping between frozenset
@@ -43,38 +79,76 @@ def GetAllIntersections(
     frozenset({'C', 'D'}): {5},
 
     frozenset({'B', 'C', 'A'}): {1}}
+
+    If `bitmask` is true, the regions are keyed by an `int` whose bit `i`
+    is set if the `i`-th set of the input contains them, for example
+    `0b0011` instead of `frozenset({'B', 'A'})`. If `countOnly` is true,
+    the regions are mapped to their cardinalities and their elements are
+    never collected.
+
+    Every element is mapped to the keys of the sets that contain it, and
+    the elements of more than one set are grouped by those keys, so it
+    runs in O(total number of elements). If all sets are `BitmapSet`
+    objects, the regions are bitmap sets computed container by container.
     """
+    if __sets and all(
+            isinstance(value, BitmapSet)
+            for value in __sets.values()):
+        from bitmap_set import GetAllIntersections as GetBitmapIntersections
+        return GetBitmapIntersections(
+            __sets,
+            bitmask=bitmask,
+            countOnly=countOnly)
     # Declaring variables ---------------------------------
-    i: int
-    j: int
-    intersectFound: bool
-    lsTemp: list[frozenset]
-    intersect: set[Any]
-    sets: dict[frozenset[str], set[Any]]
-    allIntersects: dict[frozenset[str], set[Any]]
+    gcEnabled: bool
+    memberships: dict[Any, list[int]]
+    regions: dict[tuple[int, ...], set[Any]]
+    counts: dict[tuple[int, ...], int]
+    keys: list[Hashable]
     # Finding all intersections ---------------------------
-    sets = {frozenset([key]): value for key, value in __sets.items()}
-    allIntersects = {}
-    lsTemp:tuple[frozenset[str]] = tuple(sets.keys())
-    for i, j in combinations(range(len(lsTemp)), 2):
-        intersect = sets[lsTemp[i]] & sets[lsTemp[j]]
-        if intersect:
-            allIntersects[lsTemp[i] | lsTemp[j]] = intersect
-    while True:
-        intersectFound = False
-        lsTemp = tuple(allIntersects.keys())
-        for i, j in combinations(range(len(lsTemp)), 2):
-            intersect = allIntersects[lsTemp[i]] & allIntersects[lsTemp[j]]
-            if intersect:
-                intersectFound = True
-                allIntersects[lsTemp[i]] -= intersect
-                allIntersects[lsTemp[j]] -= intersect
-                allIntersects[lsTemp[i] | lsTemp[j]] = intersect
-        if intersectFound:
-            allIntersects = {
-                key:value
-                for key, value in allIntersects.items()
-                if value}
+    # Pausing the garbage collector, which would otherwise traverse the
+    # millions of new containers again and again...
+    gcEnabled = gc.isenabled()
+    gc.disable()
+    try:
+        # Mapping every element to the positions of the sets containing
+        # it...
+        memberships = {}
+        for idx, value in enumerate(__sets.values()):
+            for elem in value:
+                positions = memberships.get(elem)
+                if positions is None:
+                    memberships[elem] = [idx]
+                else:
+                    positions.append(idx)
+        # Grouping the elements of more than one set by their positions,
+        # which are always listed in ascending order...
+        if countOnly:
+            counts = {}
+            for positions in memberships.values():
+                if len(positions) > 1:
+                    signature = tuple(positions)
+                    counts[signature] = counts.get(signature, 0) + 1
+            regions = counts
         else:
-            break
-    return allIntersects
+            regions = {}
+            for elem, positions in memberships.items():
+                if len(positions) > 1:
+                    signature = tuple(positions)
+                    elems = regions.get(signature)
+                    if elems is None:
+                        regions[signature] = {elem}
+                    else:
+                        elems.add(elem)
+        del memberships
+        if bitmask:
+            return {
+                sum(1 << idx for idx in signature): region
+                for signature, region in regions.items()}
+        keys = list(__sets)
+        return {
+            frozenset(map(keys.__getitem__, signature)): region
+            for signature, region in regions.items()}
+    finally:
+        if gcEnabled:
+            gc.enable()
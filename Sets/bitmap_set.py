@@ -0,0 +1,574 @@
+#
+# 
+#
+
+
+from array import array
+import gc
+from itertools import compress
+from typing import Any, Hashable, Iterable, Iterator
+
+
+_CHUNK_BITS = 16
+"""The number of low bits of an element that its container stores. The
+high bits select the container.
+"""
+
+_CHUNK_SIZE = 1 << _CHUNK_BITS
+"""The number of integers that one container spans."""
+
+_LOW_MASK = _CHUNK_SIZE - 1
+"""The mask of the low bits of an element."""
+
+_BITMAP_BYTES = _CHUNK_SIZE // 8
+"""The size of a bitmap container in bytes."""
+
+_ARRAY_MAX = 1 << 12
+"""The greatest cardinality of an array container. Above it a bitmap
+container is smaller, 2 bytes per element against 8 KiB per container.
+"""
+
+_MAX_REGIONS = 1 << 10
+"""The greatest number of regions of a chunk that are refined by another
+bitmap container. Beyond it, whole-bitmap operations on every region cost
+more than grouping the elements of the chunk one by one.
+"""
+
+_BYTE_BITS: tuple[tuple[int, ...], ...] = tuple(
+    tuple(bit for bit in range(8) if byte >> bit & 1)
+    for byte in range(256))
+"""A mapping from every byte value to the positions of its set bits."""
+
+_FLAG_TABLES: tuple[bytes, ...] = tuple(
+    bytes(byte >> bit & 1 for byte in range(256))
+    for bit in range(8))
+"""Translation tables which extract the `j`-th bit of a byte as a 0/1
+flag.
+"""
+
+_BIN_FLAGS = bytes.maketrans(b'01', b'\x00\x01')
+"""A translation table from the binary digits of `bin` to 0/1 flags."""
+
+_lows: tuple[int, ...] | None = None
+"""All low bits of a container in ascending order, built on the first
+decode of a dense bitmap.
+"""
+
+
+_Container = 'array[int] | int'
+"""A container holds the low bits of the elements which share the same
+high bits: either a sorted `array('H')` of at most `_ARRAY_MAX` elements
+or a bitmap of `_CHUNK_SIZE` bits in a Python `int`, so that bitmap
+operations run a machine word at a time. Containers are never mutated
+after they are built, so they are shared between sets freely.
+"""
+
+
+class BitmapSet:
+    """A set of non-negative integers stored like a roaring bitmap: the
+    elements are split by their high bits into containers of
+    `_CHUNK_SIZE` integers, and every container is a sorted array if it is
+    sparse or a bitmap if it is dense. Dense ranges take one bit per
+    element, sparse chunks two bytes per element, and intersections,
+    unions and cardinalities of bitmap containers run a word at a time.
+
+    It follows the protocol of the built-in `set` for reading, `add`,
+    `discard`, `update`, `isdisjoint` and the binary operators, so the
+    functions of this package accept it in place of a `set`.
+    """
+
+    __slots__ = ('_chunks',)
+
+    def __init__(self, iterable: Iterable[int] = ()) -> None:
+        """Creates a set of the integers of `iterable`.
+
+        #### Exceptions:
+        * `TypeError`: an element is not an integer.
+        * `ValueError`: an element is negative.
+        """
+        self._chunks: dict[int, _Container] = {}
+        self.update(iterable)
+
+    @classmethod
+    def FromRange(cls, start: int, stop: int) -> 'BitmapSet':
+        """Creates the set of the integers of `range(start, stop)`
+        container by container without enumerating them.
+
+        #### Exceptions:
+        * `ValueError`: `start` is negative.
+        """
+        if start < 0:
+            raise ValueError('the elements of a bitmap set must be '
+                f'non-negative not {start}')
+        chunks: dict[int, _Container] = {}
+        lastKey = (stop - 1) >> _CHUNK_BITS
+        for key in range(start >> _CHUNK_BITS, lastKey + 1):
+            base = key << _CHUNK_BITS
+            low = max(start - base, 0)
+            high = min(stop - base, _CHUNK_SIZE)
+            if high - low > _ARRAY_MAX:
+                chunks[key] = ((1 << (high - low)) - 1) << low
+            elif high > low:
+                chunks[key] = array('H', range(low, high))
+        return cls._FromChunks(chunks)
+
+    @classmethod
+    def _FromChunks(cls, chunks: dict[int, _Container]) -> 'BitmapSet':
+        """Wraps normalized containers without copying them."""
+        bitmapSet = cls.__new__(cls)
+        bitmapSet._chunks = chunks
+        return bitmapSet
+
+    @property
+    def nBytes(self) -> int:
+        """The memory that the containers occupy in bytes."""
+        return sum(
+            _BITMAP_BYTES if isinstance(container, int)
+            else 2 * len(container)
+            for container in self._chunks.values())
+
+    def __len__(self) -> int:
+        return sum(map(_GetCardinality, self._chunks.values()))
+
+    def __bool__(self) -> bool:
+        return bool(self._chunks)
+
+    def __contains__(self, x: Any) -> bool:
+        if type(x) is not int:
+            # Accepting integer-like objects as `update` does...
+            from operator import index
+            try:
+                x = index(x)
+            except TypeError:
+                return False
+        if x < 0:
+            return False
+        container = self._chunks.get(x >> _CHUNK_BITS)
+        if container is None:
+            return False
+        low = x & _LOW_MASK
+        if isinstance(container, int):
+            return bool(container >> low & 1)
+        from bisect import bisect_left
+        idx = bisect_left(container, low)
+        return idx < len(container) and container[idx] == low
+
+    def __iter__(self) -> Iterator[int]:
+        """Yields the elements in ascending order."""
+        for key in sorted(self._chunks):
+            base = key << _CHUNK_BITS
+            container = self._chunks[key]
+            if isinstance(container, int):
+                data = container.to_bytes(_BITMAP_BYTES, 'little')
+                for idx in compress(range(_BITMAP_BYTES), data):
+                    low = base + (idx << 3)
+                    for bit in _BYTE_BITS[data[idx]]:
+                        yield low + bit
+            else:
+                for low in container:
+                    yield base + low
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, BitmapSet):
+            # Equal sets have equal containers because they are
+            # normalized...
+            return self._chunks == other._chunks
+        if isinstance(other, (set, frozenset,)):
+            return len(self) == len(other) and all(x in other for x in self)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__qualname__}({len(self)} elements in ' \
+            f'{len(self._chunks)} containers)'
+
+    def __and__(self, other: 'BitmapSet') -> 'BitmapSet':
+        if not isinstance(other, BitmapSet):
+            return NotImplemented
+        small, large = sorted((self._chunks, other._chunks,), key=len)
+        chunks: dict[int, _Container] = {}
+        for key, container in small.items():
+            otherContainer = large.get(key)
+            if otherContainer is not None:
+                result = _Normalize(_And(container, otherContainer))
+                if result is not None:
+                    chunks[key] = result
+        return BitmapSet._FromChunks(chunks)
+
+    def __or__(self, other: 'BitmapSet') -> 'BitmapSet':
+        if not isinstance(other, BitmapSet):
+            return NotImplemented
+        result = self.copy()
+        result.update(other)
+        return result
+
+    def __ior__(self, other: 'BitmapSet') -> 'BitmapSet':
+        if not isinstance(other, BitmapSet):
+            return NotImplemented
+        self.update(other)
+        return self
+
+    def __sub__(self, other: 'BitmapSet') -> 'BitmapSet':
+        if not isinstance(other, BitmapSet):
+            return NotImplemented
+        chunks: dict[int, _Container] = {}
+        for key, container in self._chunks.items():
+            otherContainer = other._chunks.get(key)
+            if otherContainer is None:
+                chunks[key] = container
+            else:
+                result = _Normalize(_AndNot(container, otherContainer))
+                if result is not None:
+                    chunks[key] = result
+        return BitmapSet._FromChunks(chunks)
+
+    def copy(self) -> 'BitmapSet':
+        return BitmapSet._FromChunks(dict(self._chunks))
+
+    def add(self, x: int) -> None:
+        """Adds the non-negative integer `x`.
+
+        #### Exceptions:
+        * `TypeError`: the argument is not an integer.
+        * `ValueError`: the argument is negative.
+        """
+        self.update((x,))
+
+    def discard(self, x: int) -> None:
+        """Removes `x` if it is an element."""
+        if x in self:
+            key = x >> _CHUNK_BITS
+            result = _Normalize(_AndNot(
+                self._chunks[key],
+                1 << (x & _LOW_MASK)))
+            if result is None:
+                del self._chunks[key]
+            else:
+                self._chunks[key] = result
+
+    def update(self, iterable: Iterable[int]) -> None:
+        """Adds the integers of `iterable`. Other bitmap sets and `range`
+        objects are merged container by container.
+
+        #### Exceptions:
+        * `TypeError`: an element is not an integer.
+        * `ValueError`: an element is negative.
+        """
+        if isinstance(iterable, range) and iterable.step == 1:
+            iterable = BitmapSet.FromRange(iterable.start, iterable.stop)
+        if isinstance(iterable, BitmapSet):
+            chunks = iterable._chunks
+        else:
+            chunks = _GroupLows(iterable)
+        for key, container in chunks.items():
+            mine = self._chunks.get(key)
+            if mine is None:
+                self._chunks[key] = container
+            else:
+                self._chunks[key] = _Normalize(_Or(mine, container))
+
+    def isdisjoint(self, other: Iterable[Any]) -> bool:
+        """Determines whether this set and `other` have no common element.
+        Another bitmap set is compared container by container.
+        """
+        if not isinstance(other, BitmapSet):
+            return not any(x in self for x in other)
+        small, large = sorted((self._chunks, other._chunks,), key=len)
+        for key, container in small.items():
+            otherContainer = large.get(key)
+            if otherContainer is not None and \
+                    _Intersects(container, otherContainer):
+                return False
+        return True
+
+
+def _GroupLows(iterable: Iterable[int]) -> dict[int, _Container]:
+    """Groups the integers of `iterable` by their high bits into
+    normalized containers.
+    """
+    from operator import index
+    groups: dict[int, list[int]] = {}
+    for x in iterable:
+        if type(x) is not int:
+            try:
+                x = index(x)
+            except TypeError:
+                raise TypeError('the elements of a bitmap set must be '
+                    f'integers not {x.__class__.__qualname__}') from None
+        if x < 0:
+            raise ValueError('the elements of a bitmap set must be '
+                f'non-negative not {x}')
+        lows = groups.get(x >> _CHUNK_BITS)
+        if lows is None:
+            groups[x >> _CHUNK_BITS] = [x & _LOW_MASK]
+        else:
+            lows.append(x & _LOW_MASK)
+    return {
+        key: _Normalize(array('H', sorted(set(lows))))
+        for key, lows in groups.items()}
+
+
+def _GetCardinality(container: _Container) -> int:
+    if isinstance(container, int):
+        return container.bit_count()
+    return len(container)
+
+
+def _Normalize(container: _Container) -> '_Container | None':
+    """Returns the canonical form of a container: an array if it holds at
+    most `_ARRAY_MAX` elements, otherwise a bitmap, or `None` if it is
+    empty.
+    """
+    if isinstance(container, int):
+        nElems = container.bit_count()
+        if nElems == 0:
+            return None
+        if nElems <= _ARRAY_MAX:
+            return _ToArray(container)
+        return container
+    if not container:
+        return None
+    if len(container) > _ARRAY_MAX:
+        return _ToBitmap(container)
+    return container
+
+
+def _ToBitmap(container: _Container) -> int:
+    if isinstance(container, int):
+        return container
+    data = bytearray(_BITMAP_BYTES)
+    for low in container:
+        data[low >> 3] |= 1 << (low & 7)
+    return int.from_bytes(data, 'little')
+
+
+def _ToArray(container: _Container) -> 'array[int]':
+    if not isinstance(container, int):
+        return container
+    if container.bit_count() > _CHUNK_SIZE >> 6:
+        return array('H', _SelectLows(container))
+    data = container.to_bytes(_BITMAP_BYTES, 'little')
+    lows = array('H')
+    for idx in compress(range(_BITMAP_BYTES), data):
+        low = idx << 3
+        lows.extend([low + bit for bit in _BYTE_BITS[data[idx]]])
+    return lows
+
+
+def _SelectLows(bitmap: int) -> Iterator[int]:
+    """Returns an iterator over the low bits of a dense bitmap in
+    ascending order. Its bits are spread into one flag per low bit which
+    selects them from `_lows` all at once, so no integer is created for
+    them.
+    """
+    global _lows
+    data = bitmap.to_bytes(_BITMAP_BYTES, 'little')
+    flags = bytearray(_CHUNK_SIZE)
+    for bit in range(8):
+        flags[bit::8] = data.translate(_FLAG_TABLES[bit])
+    if _lows is None:
+        _lows = tuple(range(_CHUNK_SIZE))
+    return compress(_lows, flags)
+
+
+def _And(a: _Container, b: _Container) -> _Container:
+    if isinstance(a, int) and isinstance(b, int):
+        return a & b
+    if isinstance(a, int):
+        a, b = b, a
+    if isinstance(b, int):
+        data = b.to_bytes(_BITMAP_BYTES, 'little')
+        return array('H', [
+            low for low in a
+            if data[low >> 3] >> (low & 7) & 1])
+    return array('H', sorted(set(a).intersection(b)))
+
+
+def _Or(a: _Container, b: _Container) -> _Container:
+    if isinstance(a, int) or isinstance(b, int) or \
+            len(a) + len(b) > _ARRAY_MAX:
+        return _ToBitmap(a) | _ToBitmap(b)
+    return array('H', sorted(set(a).union(b)))
+
+
+def _AndNot(a: _Container, b: _Container) -> _Container:
+    if isinstance(a, int):
+        return a & ~_ToBitmap(b)
+    if isinstance(b, int):
+        data = b.to_bytes(_BITMAP_BYTES, 'little')
+        return array('H', [
+            low for low in a
+            if not data[low >> 3] >> (low & 7) & 1])
+    other = set(b)
+    return array('H', [low for low in a if low not in other])
+
+
+def _Intersects(a: _Container, b: _Container) -> bool:
+    if isinstance(a, int) and isinstance(b, int):
+        return a & b != 0
+    if isinstance(a, int):
+        a, b = b, a
+    if isinstance(b, int):
+        data = b.to_bytes(_BITMAP_BYTES, 'little')
+        return any(data[low >> 3] >> (low & 7) & 1 for low in a)
+    return not set(a).isdisjoint(b)
+
+
+def GetAllIntersections(
+        __sets: dict[Hashable, BitmapSet],
+        /,
+        *,
+        bitmask: bool = False,
+        countOnly: bool = False,
+        ) -> dict[frozenset[Hashable] | int, BitmapSet | int]:
+    """Gets all possible intersections of a collection of bitmap sets
+    like `GetAllIntersections` of the package, chunk by chunk. In every
+    chunk, the regions of the bitmap containers are refined by each of
+    them in turn with whole-bitmap operations, and the elements of the
+    array containers are grouped by the sets that hold them like the
+    inverted index of the package, so that sparse chunks cost as much as
+    their elements and dense chunks as much as their regions. The regions
+    are identified by the positions of their sets in the input, and with
+    `countOnly` only their cardinalities are summed.
+    """
+    # Pausing the garbage collector like the package does for its
+    # inverted index...
+    gcEnabled = gc.isenabled()
+    gc.disable()
+    try:
+        # Collecting the containers of every chunk in the order of the
+        # input...
+        chunkMembers: dict[int, list[tuple[int, _Container]]] = {}
+        for idx, bitmapSet in enumerate(__sets.values()):
+            for chunk, container in bitmapSet._chunks.items():
+                members = chunkMembers.get(chunk)
+                if members is None:
+                    chunkMembers[chunk] = [(idx, container,)]
+                else:
+                    members.append((idx, container,))
+        # Finding the regions of every chunk...
+        allRegions: dict[tuple[int, ...], dict[int, _Container] | int] = {}
+        for chunk, members in chunkMembers.items():
+            if len(members) < 2:
+                continue
+            for signature, region in _GetChunkRegions(members):
+                if countOnly:
+                    allRegions[signature] = allRegions.get(signature, 0) + \
+                        _GetCardinality(region)
+                else:
+                    chunks = allRegions.get(signature)
+                    if chunks is None:
+                        allRegions[signature] = chunks = {}
+                    chunks[chunk] = region
+        if not countOnly:
+            allRegions = {
+                signature: BitmapSet._FromChunks(chunks)
+                for signature, chunks in allRegions.items()}
+        if bitmask:
+            return {
+                sum(1 << idx for idx in signature): region
+                for signature, region in allRegions.items()}
+        keys = list(__sets)
+        return {
+            frozenset(map(keys.__getitem__, signature)): region
+            for signature, region in allRegions.items()}
+    finally:
+        if gcEnabled:
+            gc.enable()
+
+
+def _GetChunkRegions(
+        members: list[tuple[int, _Container]],
+        ) -> Iterator[tuple[tuple[int, ...], _Container]]:
+    """Yields the regions of one chunk, which belong to more than one set,
+    from `(position, container)` pairs of the sets which have a container
+    in it, as `(positions, container)` pairs. The regions of the bitmap
+    containers are refined as bitmaps keyed by bitmasks of positions, and
+    the elements of the array containers are grouped by the positions of
+    their sets. If the chunk gets more than `_MAX_REGIONS` regions, all of
+    its containers are grouped like array containers.
+    """
+    # Refining the regions of the bitmap containers...
+    regions: dict[int, int] = {}
+    covered = 0
+    sparseMembers: list[tuple[int, Iterable[int]]] = []
+    for idx, container in members:
+        if not isinstance(container, int):
+            sparseMembers.append((idx, container,))
+            continue
+        if len(regions) > _MAX_REGIONS:
+            # Grouping all elements of the chunk instead...
+            regions = {}
+            sparseMembers = [
+                (idx, _SelectLows(container),)
+                if isinstance(container, int) else (idx, container,)
+                for idx, container in members]
+            break
+        bit = 1 << idx
+        refined: dict[int, int] = {}
+        for signature, region in regions.items():
+            inside = region & container
+            if inside:
+                refined[signature | bit] = inside
+                region ^= inside
+            if region:
+                refined[signature] = region
+        fresh = container & ~covered
+        if fresh:
+            refined[bit] = fresh
+        covered |= container
+        regions = refined
+    # Mapping the elements of the array containers to the positions of
+    # their sets...
+    positions: dict[int, list[int]] = {}
+    for idx, container in sparseMembers:
+        for low in container:
+            lowPositions = positions.get(low)
+            if lowPositions is None:
+                positions[low] = [idx]
+            else:
+                lowPositions.append(idx)
+    # Moving the elements of the array containers out of the regions of
+    # the bitmap containers...
+    if regions and positions:
+        touched = _ToBitmap(array('H', sorted(positions)))
+        for signature in list(regions):
+            region = regions[signature]
+            inside = region & touched
+            if inside:
+                denseIdxes = _GetPositions(signature)
+                for low in _ToArray(inside):
+                    lowPositions = positions[low]
+                    lowPositions += denseIdxes
+                    lowPositions.sort()
+                region ^= inside
+                if region:
+                    regions[signature] = region
+                else:
+                    del regions[signature]
+    # Grouping the elements of the array containers by their sets...
+    groups: dict[tuple[int, ...], list[int]] = {}
+    for low, lowPositions in positions.items():
+        if len(lowPositions) < 2:
+            continue
+        signature = tuple(lowPositions)
+        lows = groups.get(signature)
+        if lows is None:
+            groups[signature] = [low]
+        else:
+            lows.append(low)
+    for signature, region in regions.items():
+        if signature & (signature - 1):
+            yield _GetPositions(signature), _Normalize(region)
+    for signature, lows in groups.items():
+        yield signature, _Normalize(array('H', sorted(lows)))
+
+
+def _GetPositions(mask: int) -> tuple[int, ...]:
+    """Returns the positions of the set bits of `mask` in ascending
+    order.
+    """
+    return tuple(compress(
+        range(mask.bit_length()),
+        bin(mask)[:1:-1].encode().translate(_BIN_FLAGS)))
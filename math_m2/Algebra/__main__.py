@@ -3,14 +3,20 @@
 #
 
 
+from typing import Generator, Iterable, TextIO
+
+
+_OUT_BUFFER_SIZE = 1 << 20
+"""The buffer size of the output of the command line interface."""
+
+_LINES_PER_WRITE = 1 << 12
+"""The number of output lines which are joined for one write call."""
+
+
 def main_factors() -> None:
     # Declaring variables ---------------------------------
-    from divisors import GetPrimeFactors, StrPow
+    from divisors import FormatFactors, GetPrimeFactors
     # Functioning -----------------------------------------
-    from pathlib import Path
-    import sys
-    projRoot = Path(__file__).resolve().parent.parent.parent
-    sys.path.append(str(projRoot))
     # Getting the number....
     while True:
         try:
@@ -21,15 +27,177 @@ def main_factors() -> None:
         except KeyboardInterrupt:
             break
         # Getting divisors...
-        divisors = GetPrimeFactors(n)
+        try:
+            divisors = GetPrimeFactors(n)
+        except ValueError:
+            print('Invalid input')
+            continue
         # Outputting...
-        text = ' X '.join(
-            StrPow(base, power)
-            for base, power in divisors.items())
-        print(text)
+        print(FormatFactors(divisors))
+
+
+def main_cli(args: list[str]) -> int:
+    """Runs the non-interactive command line interface with `args` and
+    returns the exit status:
+
+    * `primes HI [--lo LO] [--workers W]`: writes the primes in
+    `[LO, HI]`, one per line.
+    * `factor [FILE ...] [--workers W] [--ascii]`: writes `n = factors`
+    for every integer read from the files or the standard input.
+    * `count [FILE ...]`: writes `n pi(n)` for every integer read from
+    the files or the standard input.
+    """
+    import argparse
+    import sys
+    parser = argparse.ArgumentParser(
+        prog='Algebra',
+        description='Prime numbers and factorization in batch mode.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    primesParser = subparsers.add_parser(
+        'primes',
+        help='write the prime numbers of a range')
+    primesParser.add_argument('hi', type=int)
+    primesParser.add_argument('--lo', type=int, default=2)
+    primesParser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='the number of processes, 0 for all CPU cores')
+    factorParser = subparsers.add_parser(
+        'factor',
+        help='write the prime factors of integers')
+    factorParser.add_argument('files', nargs='*', default=['-'])
+    factorParser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='the number of processes, 0 for all CPU cores')
+    factorParser.add_argument(
+        '--ascii',
+        action='store_true',
+        help="write powers as p^e instead of superscripts")
+    countParser = subparsers.add_parser(
+        'count',
+        help='write the number of primes up to integers')
+    countParser.add_argument('files', nargs='*', default=['-'])
+    ns = parser.parse_args(args)
+    if ns.command == 'primes' and ns.lo > ns.hi:
+        parser.error(f'the interval of [{ns.lo}, {ns.hi}] is empty')
+    try:
+        with open(
+                sys.stdout.fileno(),
+                mode='wt',
+                encoding='utf-8',
+                buffering=_OUT_BUFFER_SIZE,
+                closefd=False,
+                ) as out:
+            match ns.command:
+                case 'primes':
+                    _WritePrimes(out, ns.lo, ns.hi, ns.workers or None)
+                case 'factor':
+                    _WriteFactors(
+                        out,
+                        _ReadNums(ns.files, 2),
+                        ns.workers or None,
+                        ns.ascii)
+                case 'count':
+                    _WriteCounts(out, _ReadNums(ns.files, 0))
+    except BrokenPipeError:
+        # The reader of the output has gone away, so silencing the final
+        # flush of the standard output at exit...
+        import os
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    return 0
+
+
+def _ReadNums(
+        paths: list[str],
+        minimum: int,
+        ) -> Generator[int, None, None]:
+    """Yields the whitespace-separated integers of the files at `paths`,
+    `-` for the standard input, that are not less than `minimum`. Invalid
+    tokens are reported to the standard error and skipped.
+    """
+    import sys
+    for path in paths:
+        if path == '-':
+            yield from _ParseNums(sys.stdin, minimum)
+        else:
+            with open(path, mode='rt', encoding='utf-8') as fileobj:
+                yield from _ParseNums(fileobj, minimum)
+
+
+def _ParseNums(
+        lines: Iterable[str],
+        minimum: int,
+        ) -> Generator[int, None, None]:
+    import sys
+    for line in lines:
+        for token in line.split():
+            try:
+                n = int(token)
+            except ValueError:
+                n = minimum - 1
+            if n < minimum:
+                print(f'Invalid input: {token}', file=sys.stderr)
+            else:
+                yield n
+
+
+def _WritePrimes(out: TextIO, lo: int, hi: int, workers: int | None) -> None:
+    from itertools import islice
+    from prime_nums import GetPrimeNums, GetPrimesInRange
+    if lo <= 2 and hi >= 2:
+        primes = GetPrimeNums(hi, workers)
+    else:
+        primes = GetPrimesInRange(lo, hi)
+    while True:
+        lines = '\n'.join(map(str, islice(primes, _LINES_PER_WRITE)))
+        if not lines:
+            break
+        out.write(lines)
+        out.write('\n')
+
+
+def _WriteFactors(
+        out: TextIO,
+        nums: Iterable[int],
+        workers: int | None,
+        ascii: bool,
+        ) -> None:
+    from divisors import FactorMany, WriteFactors
+    WriteFactors(out, FactorMany(nums, workers), ascii)
+
+
+def _WriteCounts(out: TextIO, nums: Iterable[int]) -> None:
+    from itertools import islice
+    from prime_nums import PrimeCount
+    while True:
+        lines = '\n'.join(
+            f'{n} {PrimeCount(n)}'
+            for n in islice(nums, _LINES_PER_WRITE))
+        if not lines:
+            break
+        out.write(lines)
+        out.write('\n')
+
+
+def _SetUpPath() -> None:
+    """Makes this package and the project root importable, once."""
+    from pathlib import Path
+    import sys
+    pkgDir = Path(__file__).resolve().parent
+    for path in (str(pkgDir), str(pkgDir.parent.parent),):
+        if path not in sys.path:
+            sys.path.append(path)
 
 
 def main() -> None:
+    import sys
+    _SetUpPath()
+    if len(sys.argv) > 1:
+        sys.exit(main_cli(sys.argv[1:]))
     while True:
         try:
             print('1. Decomposition to prime factors')
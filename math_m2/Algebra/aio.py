@@ -0,0 +1,169 @@
+#
+# 
+#
+
+
+import asyncio
+from concurrent.futures import Executor
+from typing import AsyncGenerator, Iterator
+
+
+_TIME_SLICE = 0.005
+"""The default time in seconds that the coroutines of this module run
+before they give control back to the event loop.
+"""
+
+_CHUNK = 1 << 10
+"""The number of primes that are produced between checks of the clock."""
+
+_EXECUTOR_SPAN = 1 << 22
+"""The number of integers that one executor job sieves."""
+
+_PREFETCH = 2
+"""The number of executor jobs that are kept running ahead of the
+consumer.
+"""
+
+_INLINE_LIMIT = 1 << 32
+"""Integers less than this bound are factored in the event loop, because
+it takes less time than handing them to an executor.
+"""
+
+
+async def GetPrimeNumsAsync(
+        n: int,
+        executor: Executor | None = None,
+        timeSlice: float = _TIME_SLICE,
+        ) -> AsyncGenerator[int, None]:
+    """Yields all prime numbers less than or equal to `n` like
+    `GetPrimeNums` without blocking the event loop. Without `executor`,
+    the primes come from the registered table, the prime cache if it
+    already covers `n`, or the segmented sieve, and control is given back
+    to the loop every `timeSlice` seconds. With `executor`, spans of the
+    range are sieved there, a few of them ahead of the consumer.
+
+    Cancelling the consumer, or closing the generator, cancels the jobs
+    that have not started yet.
+
+    #### Exceptions:
+    * `TypeError`: the argument is not a whole number.
+    * `ValueError`: the number is not greater than one.
+    """
+    from cache import GetPrimeCache
+    from prime_nums import _AssertPrimeLimit, _GetPrimeTable, \
+        _IterSegmentPrimes
+    n_ = _AssertPrimeLimit(n)
+    table = _GetPrimeTable()
+    if table is not None and table.Covers(n_):
+        primes = table.GetPrimes(n_)
+    elif executor is None:
+        cache = GetPrimeCache()
+        if n_ <= cache.limit:
+            primes = cache.GetPrimes(n_)
+        else:
+            primes = _IterSegmentPrimes(2, n_ + 1)
+    else:
+        async for prime in _GetPrimesInExecutor(n_, executor, timeSlice):
+            yield prime
+        return
+    async for prime in _IterSliced(primes, timeSlice):
+        yield prime
+
+
+async def _GetPrimesInExecutor(
+        n: int,
+        executor: Executor,
+        timeSlice: float,
+        ) -> AsyncGenerator[int, None]:
+    from collections import deque
+    loop = asyncio.get_running_loop()
+    spans = iter(range(2, n + 1, _EXECUTOR_SPAN))
+    pending: deque[asyncio.Future] = deque()
+    try:
+        while True:
+            # Keeping a few jobs ahead of the consumer...
+            for start in spans:
+                pending.append(loop.run_in_executor(
+                    executor,
+                    _SievePrimes_Proc,
+                    start,
+                    min(start + _EXECUTOR_SPAN, n + 1)))
+                if len(pending) >= _PREFETCH:
+                    break
+            if not pending:
+                break
+            primes = await pending.popleft()
+            async for prime in _IterSliced(primes, timeSlice):
+                yield prime
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _SievePrimes_Proc(start: int, stop: int) -> 'array[int]':
+    """Returns the primes in `[start, stop)` as an `array('Q')`."""
+    from array import array
+    from prime_nums import _IterSegmentPrimes
+    return array('Q', _IterSegmentPrimes(start, stop))
+
+
+async def _IterSliced(
+        primes: Iterator[int],
+        timeSlice: float,
+        ) -> AsyncGenerator[int, None]:
+    """Yields the elements of `primes`, producing them in chunks, and
+    gives control back to the event loop once every `timeSlice` seconds.
+    """
+    from itertools import islice
+    from time import perf_counter
+    primes = iter(primes)
+    deadline = perf_counter() + timeSlice
+    while True:
+        chunk = list(islice(primes, _CHUNK))
+        if not chunk:
+            break
+        for prime in chunk:
+            yield prime
+        if perf_counter() >= deadline:
+            await asyncio.sleep(0)
+            deadline = perf_counter() + timeSlice
+
+
+async def GetPrimeFactorsAsync(
+        n: int,
+        executor: Executor | None = None,
+        ) -> dict[int, int]:
+    """Decomposes `n` into prime factors like `GetPrimeFactors` without
+    blocking the event loop. Cached factorizations, the integers that the
+    registered smallest-prime-factor table covers and those less than
+    `_INLINE_LIMIT` are answered at once. The others are factored in
+    `executor`, the default executor of the loop if it is `None`, and
+    cached in this process.
+
+    Cancelling the caller cancels the job if it has not started yet,
+    otherwise it runs to completion in the background.
+
+    #### Exceptions:
+    * `TypeError`: the argument is not a whole number.
+    * `ValueError`: the number is not greater than one.
+    """
+    from collections import defaultdict
+    from cache import EstimateFactorsBytes, GetFactorCache
+    from divisors import _FactorUncached, _GetSpfTable
+    from prime_nums import _AssertPrimeLimit
+    n = _AssertPrimeLimit(n)
+    cache = GetFactorCache()
+    cached = cache.Get(n)
+    if cached is not None:
+        return defaultdict(int, cached)
+    # Factoring without GetPrimeFactors, which would count a second miss...
+    table = _GetSpfTable()
+    if n < _INLINE_LIMIT or (table is not None and table.Covers(n)):
+        factors = _FactorUncached(n)
+    else:
+        factors = await asyncio.get_running_loop().run_in_executor(
+            executor,
+            _FactorUncached,
+            n)
+    cache.Put(n, dict(factors), EstimateFactorsBytes(n, factors))
+    return factors
@@ -0,0 +1,305 @@
+#
+# 
+#
+
+
+from array import array
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Generator, Hashable, NamedTuple
+
+
+_MAX_FACTORS = 1 << 16
+"""The default number of factorizations that the factor cache keeps."""
+
+_MAX_FACTOR_BYTES = 64 << 20
+"""The default memory cap of the factor cache in bytes."""
+
+_MAX_PRIME_BYTES = 64 << 20
+"""The default memory cap of the prime cache in bytes, 8 bytes per
+prime. It holds all primes up to about 1.5 * 10^8.
+"""
+
+_MIN_PRIME_LIMIT = 1 << 16
+"""The least limit that the prime cache grows to."""
+
+_factorCache: 'LruCache | None' = None
+"""The process-wide cache of factorizations."""
+
+_primeCache: 'PrimeCache | None' = None
+"""The process-wide cache of the primes."""
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    nBytes: int
+    maxSize: int
+    maxBytes: int
+
+
+class LruCache:
+    """A thread-safe mapping which is bounded both in the number of
+    entries and in their estimated memory, and which evicts the least
+    recently used entries first. It counts hits, misses and evictions.
+    """
+
+    def __init__(self, maxSize: int, maxBytes: int) -> None:
+        self._maxSize = maxSize
+        self._maxBytes = maxBytes
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._lock = Lock()
+        self._nBytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def Get(self, key: Hashable, default: Any = None) -> Any:
+        """Returns the value of `key`, marking it as the most recently
+        used, or `default` if it is not in the cache.
+        """
+        with self._lock:
+            try:
+                value, _ = self._entries[key]
+            except KeyError:
+                self._misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def Put(self, key: Hashable, value: Any, nBytes: int) -> None:
+        """Stores `value` for `key` with the estimated size of `nBytes`
+        and evicts the least recently used entries to keep the bounds.
+        A value greater than the memory cap is not stored.
+        """
+        if nBytes > self._maxBytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._nBytes -= old[1]
+            self._entries[key] = (value, nBytes,)
+            self._nBytes += nBytes
+            while len(self._entries) > self._maxSize or \
+                    self._nBytes > self._maxBytes:
+                _, (_, size) = self._entries.popitem(last=False)
+                self._nBytes -= size
+                self._evictions += 1
+
+    def Evict(self, key: Hashable) -> bool:
+        """Removes `key` from the cache and returns whether it was there."""
+        with self._lock:
+            try:
+                _, size = self._entries.pop(key)
+            except KeyError:
+                return False
+            self._nBytes -= size
+            self._evictions += 1
+            return True
+
+    def Clear(self) -> None:
+        """Removes all entries. The counters are kept."""
+        with self._lock:
+            self._evictions += len(self._entries)
+            self._entries.clear()
+            self._nBytes = 0
+
+    def SetLimits(
+            self,
+            maxSize: int | None = None,
+            maxBytes: int | None = None,
+            ) -> None:
+        """Changes the bounds of the cache and evicts entries if needed."""
+        with self._lock:
+            if maxSize is not None:
+                self._maxSize = maxSize
+            if maxBytes is not None:
+                self._maxBytes = maxBytes
+            while len(self._entries) > self._maxSize or \
+                    self._nBytes > self._maxBytes:
+                _, (_, size) = self._entries.popitem(last=False)
+                self._nBytes -= size
+                self._evictions += 1
+
+    @property
+    def info(self) -> CacheInfo:
+        """The counters and the bounds of the cache."""
+        with self._lock:
+            return CacheInfo(
+                self._hits,
+                self._misses,
+                self._evictions,
+                len(self._entries),
+                self._nBytes,
+                self._maxSize,
+                self._maxBytes)
+
+
+class PrimeCache:
+    """A thread-safe, ascending list of all primes up to a limit which
+    grows by doubling, stored 8 bytes per prime in an `array('Q')`. It
+    stops growing at a memory cap, beyond which the primes are sieved on
+    every request.
+    """
+
+    def __init__(self, maxBytes: int) -> None:
+        self._maxBytes = maxBytes
+        self._primes = array('Q')
+        self._limit = 1
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def limit(self) -> int:
+        """The greatest integer that the cached primes cover."""
+        return self._limit
+
+    def GetPrimes(self, n: int) -> Generator[int, None, None]:
+        """Yields all prime numbers less than or equal to `n >= 2`. The
+        cached primes are yielded straight from the cache. If the cache
+        must grow, its limit is doubled if that is allowed: the rest is
+        sieved block by block, every block is appended to the cache and
+        yielded before the next one is sieved, and the blocks beyond `n`
+        are sieved after the last prime has been yielded. Otherwise the
+        rest is sieved without caching.
+        """
+        import math
+        from bisect import bisect_right
+        from itertools import islice
+        from prime_nums import _GetBasePrimes, _IterSegmentPrimes
+        basePrimes: list[int] | None = None
+        primes: array | None = None
+        idx: int | None = None
+        last = 1
+        with self._lock:
+            if n <= self._limit:
+                self._hits += 1
+                target = max(n, _MIN_PRIME_LIMIT)
+            else:
+                self._misses += 1
+                target = max(n, 2 * self._limit, _MIN_PRIME_LIMIT)
+        while True:
+            with self._lock:
+                if primes is not self._primes:
+                    # The cache has been dropped, so the yielded primes
+                    # are found in the new one after it has grown...
+                    if idx:
+                        last = primes[idx - 1]
+                    primes = self._primes
+                    idx = None
+                limit = self._limit
+                overCap = False
+                if n <= limit:
+                    stop = bisect_right(primes, n)
+                elif self._EstimateBytes(target) > self._maxBytes:
+                    stop = len(primes)
+                    overCap = True
+                else:
+                    if basePrimes is None:
+                        basePrimes = _GetBasePrimes(math.isqrt(target))
+                    self._Extend(target, basePrimes)
+                    stop = bisect_right(primes, n)
+                if idx is None:
+                    idx = bisect_right(primes, last)
+                    it = islice(primes, idx, None)
+            # Yielding without a copy, the cache only grows at its end and
+            # its iterator sees the appended primes...
+            yield from islice(it, stop - idx)
+            idx = stop
+            if overCap:
+                yield from _IterSegmentPrimes(limit + 1, n + 1)
+                return
+            if n <= limit:
+                break
+        # Growing the cache up to the doubled limit...
+        while True:
+            with self._lock:
+                if (self._limit >= target
+                        or self._EstimateBytes(target) > self._maxBytes):
+                    return
+                if basePrimes is None:
+                    basePrimes = _GetBasePrimes(math.isqrt(target))
+                self._Extend(target, basePrimes)
+
+    def Clear(self) -> None:
+        """Drops all cached primes. The counters are kept."""
+        with self._lock:
+            self._evictions += len(self._primes)
+            self._primes = array('Q')
+            self._limit = 1
+
+    def SetLimits(self, maxBytes: int) -> None:
+        """Changes the memory cap and drops the primes if they exceed it."""
+        with self._lock:
+            self._maxBytes = maxBytes
+            if self._primes.itemsize * len(self._primes) > maxBytes:
+                self._evictions += len(self._primes)
+                self._primes = array('Q')
+                self._limit = 1
+
+    @property
+    def info(self) -> CacheInfo:
+        """The counters and the bounds of the cache. The size is the
+        number of cached primes.
+        """
+        with self._lock:
+            return CacheInfo(
+                self._hits,
+                self._misses,
+                self._evictions,
+                len(self._primes),
+                self._primes.itemsize * len(self._primes),
+                -1,
+                self._maxBytes)
+
+    def _Extend(self, target: int, basePrimes: list[int]) -> None:
+        """Appends the primes of the next block up to `target` to the
+        cache. The lock must be held.
+        """
+        from prime_nums import _IterSegmentPrimes, _SEGMENT_SIZE
+        high = min(self._limit + 1 + 2 * _SEGMENT_SIZE, target + 1)
+        self._primes.extend(
+            _IterSegmentPrimes(self._limit + 1, high, basePrimes))
+        self._limit = high - 1
+
+    def _EstimateBytes(self, limit: int) -> int:
+        """Estimates the memory of the primes up to `limit` from an upper
+        bound of pi(limit).
+        """
+        import math
+        return int(8 * 1.26 * limit / math.log(limit))
+
+
+def GetFactorCache() -> LruCache:
+    """Returns the process-wide cache of `GetPrimeFactors`."""
+    global _factorCache
+    if _factorCache is None:
+        _factorCache = LruCache(_MAX_FACTORS, _MAX_FACTOR_BYTES)
+    return _factorCache
+
+
+def GetPrimeCache() -> PrimeCache:
+    """Returns the process-wide cache of `GetPrimeNums`."""
+    global _primeCache
+    if _primeCache is None:
+        _primeCache = PrimeCache(_MAX_PRIME_BYTES)
+    return _primeCache
+
+
+def ClearCaches() -> None:
+    """Empties both process-wide caches."""
+    GetFactorCache().Clear()
+    GetPrimeCache().Clear()
+
+
+def EstimateFactorsBytes(n: int, factors: dict[int, int]) -> int:
+    """Estimates the memory that a factorization entry occupies."""
+    from sys import getsizeof
+    return getsizeof(n) + getsizeof(factors) + sum(
+        getsizeof(p) + getsizeof(e)
+        for p, e in factors.items())
@@ -2,24 +2,206 @@
 # 
 #
 
+
+from concurrent.futures import Future
+from os import PathLike
+from typing import Generator, Iterable, TextIO, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from spf import SpfTable
+
+
+_TRIAL_LIMIT = 1 << 10
+"""Factors less than this bound are found by trial division."""
+
+_RHO_BATCH = 128
+"""The number of steps of Pollard's rho whose differences are multiplied
+together before a single `gcd` is taken.
+"""
+
+_RHO_BUDGET = 1 << 20
+"""The number of steps after which Pollard's rho gives up in favor of
+the elliptic curve method. It is enough for factors up to about 10^11.
+"""
+
+_FACTOR_CHUNK = 1 << 10
+"""The number of integers that `FactorMany` sends to a worker process
+at once.
+"""
+
+_RANGE_SEGMENT = 1 << 16
+"""The number of integers that `FactorRange` sieves at once when no
+smallest-prime-factor table covers its range.
+"""
+
+_SIEVE_RATIO = 1 << 12
+"""`FactorRange` factors every integer on its own if its window is
+narrower than the square root of `hi` over this ratio, because sieving
+a segment costs a step for every prime up to that square root.
+"""
+
+_SMALL_POWERS = 1 << 7
+"""Exponents less than this bound have their strings precomputed for
+formatting factorizations. It covers every exponent of a 64-bit integer.
+"""
+
+_WRITE_CHUNK = 1 << 12
+"""The number of lines that `WriteFactors` joins for one write call."""
+
+_powerStrs: dict[bool, list[str]] = {}
+"""A mapping from the ASCII mode to the strings of the small exponents,
+computed on the first use.
+"""
+
+_trialPrimes: list[int] = []
+"""The primes less than `_TRIAL_LIMIT`, computed on the first use."""
+
+_spfTable: 'SpfTable | None' = None
+"""The smallest-prime-factor table registered for `GetPrimeFactors`."""
+
+_spfTableLoaded = False
+"""Whether `_spfTable` has been set explicitly or from the environment."""
+
+
 def StrPow(base: int, power: int) -> str:
-    from string_mega import GetSuperNum
     if power == 1:
         return str(base)
+    elif 0 < power < _SMALL_POWERS:
+        return f'{base}{_GetPowerStrs(False)[power]}'
     else:
+        from string_mega import GetSuperNum
         powStr = GetSuperNum(str(power))
         return f'{base}{powStr}'
 
 
+def FormatFactors(factors: dict[int, int], ascii: bool = False) -> str:
+    """Returns the prime factorization of `factors`, as returned by
+    `GetPrimeFactors`, as text like `2³ X 3² X 5`, or like `2^3 X 3^2 X 5`
+    if `ascii` is true.
+    """
+    return _JoinFactors(factors, _GetPowerStrs(ascii), ascii)
+
+
+def WriteFactors(
+        out: TextIO,
+        items: Iterable['dict[int, int] | tuple[int, dict[int, int]]'],
+        ascii: bool = False,
+        ) -> None:
+    """Writes one line per element of `items` to the text stream `out` in
+    the format of `FormatFactors`. An element is either a factorization
+    or an `(n, factors)` pair, as yielded by `FactorMany` and
+    `FactorRange`, which is written as `n = factors`. The lines are
+    rendered and written in blocks of `_WRITE_CHUNK`.
+    """
+    from itertools import islice
+    powers = _GetPowerStrs(ascii)
+    iterItems = iter(items)
+    while True:
+        lines: list[str] = []
+        for item in islice(iterItems, _WRITE_CHUNK):
+            if isinstance(item, tuple):
+                n, factors = item
+                prefix = f'{n} = '
+            else:
+                factors = item
+                prefix = ''
+            lines.append(prefix + _JoinFactors(factors, powers, ascii))
+        if not lines:
+            break
+        lines.append('')
+        out.write('\n'.join(lines))
+
+
+def _JoinFactors(
+        factors: dict[int, int],
+        powers: list[str],
+        ascii: bool,
+        ) -> str:
+    """`FormatFactors` with the strings of the small exponents."""
+    nPowers = len(powers)
+    return ' X '.join([
+        f'{base}{powers[power]}' if 0 <= power < nPowers
+        else _FormatPow(base, power, powers, ascii)
+        for base, power in factors.items()])
+
+
+def _FormatPow(base: int, power: int, powers: list[str], ascii: bool) -> str:
+    """Formats one prime power whose exponent may be out of `powers`."""
+    if 0 <= power < len(powers):
+        return f'{base}{powers[power]}'
+    elif ascii:
+        return f'{base}^{power}'
+    else:
+        return StrPow(base, power)
+
+
+def _GetPowerStrs(ascii: bool) -> list[str]:
+    """Returns the strings of the exponents less than `_SMALL_POWERS`,
+    which follow the bases in factorizations, in superscripts or as `^e`
+    if `ascii` is true. The string of one is empty.
+    """
+    try:
+        return _powerStrs[ascii]
+    except KeyError:
+        pass
+    if ascii:
+        powers = [f'^{power}' for power in range(_SMALL_POWERS)]
+    else:
+        from string_mega import GetSuperNum
+        powers = [GetSuperNum(str(power)) for power in range(_SMALL_POWERS)]
+    powers[1] = ''
+    _powerStrs[ascii] = powers
+    return powers
+
+
 def GetPrimeFactors(n: int) -> dict[int, int]:
+    """Decomposes `n` into prime factors and returns a mapping from the
+    prime factors, in ascending order, to their powers. The small factors
+    are found by trial division, the cofactor is tested by `IsPrime` and
+    the remaining composites are split by Brent's variant of Pollard's
+    rho, so any 64-bit integer is factored in milliseconds. Composites
+    that rho cannot split within `_RHO_BUDGET` steps, those with two
+    large factors, go to the elliptic curve method. If a
+    smallest-prime-factor table has been registered through
+    `UseSpfTable` and covers `n`, it is used instead. The results are
+    memoized in the process-wide LRU cache of `cache.GetFactorCache`.
+
+    #### Exceptions:
+    * `TypeError`: the argument is not a whole number.
+    * `ValueError`: the number is not greater than one.
     """
+    from collections import defaultdict
+    from cache import EstimateFactorsBytes, GetFactorCache
+    from prime_nums import _AssertPrimeLimit
+    n = _AssertPrimeLimit(n)
+    cache = GetFactorCache()
+    cached = cache.Get(n)
+    if cached is not None:
+        return defaultdict(int, cached)
+    divisors = _FactorUncached(n)
+    cache.Put(n, dict(divisors), EstimateFactorsBytes(n, divisors))
+    return divisors
+
+
+def _FactorUncached(n: int) -> dict[int, int]:
+    """`GetPrimeFactors` without checking the argument and caching, for
+    callers that look up and fill the cache themselves.
     """
+    table = _GetSpfTable()
+    if table is not None and table.Covers(n):
+        return table.Factor(n)
+    return _FactorNum(n)
+
+
+def _FactorNum(n: int) -> dict[int, int]:
+    """`GetPrimeFactors` without checking the argument and caching."""
     from collections import defaultdict
-    import math
-    from prime_nums import GetPrimeNums
-    primes = list(GetPrimeNums(math.isqrt(n)))
-    divisors: dict[int, int] = defaultdict(lambda: 0)
-    for prime in primes:
+    from primality import _IsPrime
+    divisors: dict[int, int] = defaultdict(int)
+    # Dividing by small primes...
+    for prime in _GetTrialPrimes():
+        if prime * prime > n:
+            break
         while True:
             quotient, remainder = divmod(n, prime)
             if remainder == 0:
@@ -27,8 +209,424 @@ def GetPrimeFactors(n: int) -> dict[int, int]:
                 n = quotient
             else:
                 break
-        if n == 1:
+    # Splitting the cofactor...
+    if n < _TRIAL_LIMIT * _TRIAL_LIMIT:
+        if n > 1:
+            divisors[n] += 1
+        return divisors
+    composites = [n]
+    while composites:
+        m = composites.pop()
+        if _IsPrime(m):
+            divisors[m] += 1
+        else:
+            d = _GetPerfectPowerRoot(m) or _PollardBrent(m, _RHO_BUDGET)
+            if d is None:
+                # Escalating to the elliptic curve method...
+                from ecm import FindFactorECM
+                d = FindFactorECM(m)
+            composites.append(d)
+            composites.append(m // d)
+    return defaultdict(int, sorted(divisors.items()))
+
+
+def FactorRange(
+        lo: int,
+        hi: int,
+        ) -> Generator[tuple[int, dict[int, int]], None, None]:
+    """Yields `(n, GetPrimeFactors(n))` for every integer `n` in the
+    closed interval `[max(lo, 2), hi]` in ascending order. Each `n` is
+    factored in O(log n) steps by the registered smallest-prime-factor
+    table if it covers `hi`. Otherwise only the window itself is sieved,
+    segment by segment, by the primes up to the square root of `hi`, or
+    if the window is too narrow for that, every integer is factored on
+    its own.
+
+    #### Exceptions:
+    * `TypeError`: a bound is not a whole number.
+    * `ValueError`: `hi` is not greater than one or `lo` is greater than
+    `hi`.
+    """
+    import math
+    from prime_nums import _AssertPrimeLimit, _AssertWholeNum
+    from prime_nums import _GetBasePrimes
+    # Checking the arguments...
+    lo = _AssertWholeNum(lo)
+    hi = _AssertPrimeLimit(hi)
+    if lo > hi:
+        raise ValueError(f'the interval of [{lo}, {hi}] is empty')
+    lo = max(lo, 2)
+    # Factoring...
+    table = _GetSpfTable()
+    if table is not None and table.Covers(hi):
+        Factor = table.Factor
+        for n in range(lo, hi + 1):
+            yield n, Factor(n)
+    elif hi - lo < math.isqrt(hi) // _SIEVE_RATIO:
+        for n in range(lo, hi + 1):
+            yield n, GetPrimeFactors(n)
+    else:
+        basePrimes = _GetBasePrimes(math.isqrt(hi))
+        for start in range(lo, hi + 1, _RANGE_SEGMENT):
+            stop = min(start + _RANGE_SEGMENT, hi + 1)
+            yield from zip(
+                range(start, stop),
+                _FactorSegment(start, stop, basePrimes))
+
+
+def _FactorSegment(
+        start: int,
+        stop: int,
+        basePrimes: list[int],
+        ) -> list[dict[int, int]]:
+    """Returns the prime factors of every integer in `[start, stop)`,
+    where `start` is at least two and `basePrimes` are all primes up to
+    `isqrt(stop - 1)`. Every integer keeps a remaining cofactor, which
+    the multiples of each base prime are divided by, and a cofactor
+    greater than one at the end is a single prime above the square root.
+    """
+    from collections import defaultdict
+    size = stop - start
+    rem = list(range(start, stop))
+    factors: list[dict[int, int]] = [defaultdict(int) for _ in rem]
+    for p in basePrimes:
+        if p * p >= stop:
             break
-    if n > 1:
-        divisors[n] += 1
-    return divisors
+        for idx in range(-start % p, size, p):
+            # Dividing out p and counting its exponent...
+            m = rem[idx] // p
+            e = 1
+            while m % p == 0:
+                m //= p
+                e += 1
+            rem[idx] = m
+            factors[idx][p] = e
+    # Adding the prime factors above the square root...
+    for idx, m in enumerate(rem):
+        if m > 1:
+            factors[idx][m] += 1
+    return factors
+
+
+def FactorMany(
+        nums: Iterable[int],
+        workers: int | None = None,
+        ordered: bool = True,
+        ) -> Generator[tuple[int, dict[int, int]], None, None]:
+    """Yields `(n, GetPrimeFactors(n))` for every integer of `nums` by
+    factoring them in `workers` processes (`None` for all CPU cores).
+    The input is consumed in windows, each window is sorted by the size
+    of the integers and cut into chunks of similar cost, and only a few
+    windows are in flight at a time so that inputs of any length are
+    streamed. The results come in the order of `nums` if `ordered` is
+    true, otherwise as soon as their chunks are done.
+
+    Every worker warms its trial-division primes and the tables of the
+    `SPF_TABLE` and `PRIME_TABLE` environment variables once, when it
+    starts.
+
+    #### Exceptions:
+    * `TypeError`: an element is not a whole number.
+    * `ValueError`: an element is not greater than one.
+    """
+    from collections import deque
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+    from itertools import islice
+    import os
+    from prime_nums import _AssertPrimeLimit
+    if workers == 1:
+        for num in nums:
+            yield num, GetPrimeFactors(num)
+        return
+    nWorkers = workers or os.cpu_count() or 1
+    windowSize = 4 * nWorkers * _FACTOR_CHUNK
+    pPool = ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_InitFactorProc)
+    try:
+        iterNums = iter(nums)
+        windows: deque[tuple[list[int], list[tuple[list[int], Future]]]] = \
+            deque()
+        pending: dict[Future, list[int]] = {}
+        while True:
+            window = [
+                _AssertPrimeLimit(num)
+                for num in islice(iterNums, windowSize)]
+            if window:
+                # Submitting the window in chunks of similar integers...
+                order = sorted(
+                    range(len(window)),
+                    key=lambda idx: window[idx].bit_length())
+                chunks: list[tuple[list[int], Future]] = []
+                for start in range(0, len(order), _FACTOR_CHUNK):
+                    idxs = order[start:start + _FACTOR_CHUNK]
+                    chunk = [window[idx] for idx in idxs]
+                    future = pPool.submit(_FactorChunk_Proc, chunk)
+                    chunks.append((idxs, future,))
+                    pending[future] = chunk
+                windows.append((window, chunks,))
+            if ordered:
+                # Yielding the oldest window when two windows are in
+                # flight or the input is exhausted...
+                while windows and (len(windows) > 1 or not window):
+                    oldWindow, chunks = windows.popleft()
+                    results: list[dict[int, int]] = [{}] * len(oldWindow)
+                    for idxs, future in chunks:
+                        del pending[future]
+                        for idx, factors in zip(idxs, future.result()):
+                            results[idx] = factors
+                    yield from zip(oldWindow, results)
+            else:
+                # Yielding the chunks that are done...
+                windows.clear()
+                while pending and (
+                        len(pending) > 4 * nWorkers or not window):
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from zip(pending.pop(future), future.result())
+            if not window:
+                break
+    finally:
+        pPool.shutdown(cancel_futures=True)
+
+
+def _InitFactorProc() -> None:
+    from prime_nums import _GetPrimeTable
+    _GetTrialPrimes()
+    _GetSpfTable()
+    _GetPrimeTable()
+
+
+def _FactorChunk_Proc(nums: list[int]) -> list[dict[int, int]]:
+    return [GetPrimeFactors(num) for num in nums]
+
+
+def Divisors(
+        n: int,
+        factors: dict[int, int] | None = None,
+        ) -> Generator[int, None, None]:
+    """Yields all positive divisors of `n`, not in ascending order, by
+    running an odometer over the exponents of its prime factors. Only the
+    current divisor is kept, so highly composite numbers never build the
+    whole list. `factors`, if provided, must be the factorization of `n`
+    as returned by `GetPrimeFactors`.
+
+    #### Exceptions:
+    * `TypeError`: the argument is not a whole number.
+    * `ValueError`: the number is not positive.
+    """
+    factors_ = _GetFactorsOf(n, factors)
+    primes = list(factors_.keys())
+    maxPowers = list(factors_.values())
+    # The powers of the primes that are dropped when a digit rolls over...
+    fullPowers = [p ** e for p, e in factors_.items()]
+    powers = [0] * len(primes)
+    divisor = 1
+    yield divisor
+    while True:
+        idx = 0
+        while idx < len(primes) and powers[idx] == maxPowers[idx]:
+            divisor //= fullPowers[idx]
+            powers[idx] = 0
+            idx += 1
+        if idx == len(primes):
+            return
+        divisor *= primes[idx]
+        powers[idx] += 1
+        yield divisor
+
+
+def Sigma(
+        n: int,
+        k: int = 1,
+        factors: dict[int, int] | None = None,
+        ) -> int:
+    """Returns the sum of the `k`-th powers of the positive divisors of
+    `n` from the exponents of its prime factors. `factors`, if provided,
+    must be the factorization of `n` as returned by `GetPrimeFactors`.
+
+    #### Exceptions:
+    * `TypeError`: `n` or `k` is not a whole number.
+    * `ValueError`: the number is not positive or `k` is negative.
+    """
+    from prime_nums import _AssertWholeNum
+    factors_ = _GetFactorsOf(n, factors)
+    k = _AssertWholeNum(k)
+    if k < 0:
+        raise ValueError(f'a non-negative power is required not {k}')
+    if k == 0:
+        return Tau(n, factors_)
+    result = 1
+    for p, e in factors_.items():
+        pk = p ** k
+        result *= (pk ** (e + 1) - 1) // (pk - 1)
+    return result
+
+
+def Tau(n: int, factors: dict[int, int] | None = None) -> int:
+    """Returns the number of positive divisors of `n`. `factors`, if
+    provided, must be the factorization of `n` as returned by
+    `GetPrimeFactors`.
+
+    #### Exceptions:
+    * `TypeError`: the argument is not a whole number.
+    * `ValueError`: the number is not positive.
+    """
+    result = 1
+    for e in _GetFactorsOf(n, factors).values():
+        result *= e + 1
+    return result
+
+
+def Totient(n: int, factors: dict[int, int] | None = None) -> int:
+    """Returns Euler's totient of `n`, the number of integers in `[1, n]`
+    coprime to `n`. `factors`, if provided, must be the factorization of
+    `n` as returned by `GetPrimeFactors`.
+
+    #### Exceptions:
+    * `TypeError`: the argument is not a whole number.
+    * `ValueError`: the number is not positive.
+    """
+    result = 1
+    for p, e in _GetFactorsOf(n, factors).items():
+        result *= (p - 1) * p ** (e - 1)
+    return result
+
+
+def Mobius(n: int, factors: dict[int, int] | None = None) -> int:
+    """Returns the Mobius function of `n`: zero if `n` has a squared
+    prime factor, otherwise -1 raised to the number of its prime factors.
+    `factors`, if provided, must be the factorization of `n` as returned
+    by `GetPrimeFactors`.
+
+    #### Exceptions:
+    * `TypeError`: the argument is not a whole number.
+    * `ValueError`: the number is not positive.
+    """
+    factors_ = _GetFactorsOf(n, factors)
+    if any(e > 1 for e in factors_.values()):
+        return 0
+    return -1 if len(factors_) & 1 else 1
+
+
+def _GetFactorsOf(
+        n: int,
+        factors: dict[int, int] | None,
+        ) -> dict[int, int]:
+    """Returns `factors` if it is provided, otherwise the factorization of
+    the positive integer `n`, which is empty for one.
+
+    #### Exceptions:
+    * `TypeError`: the argument is not a whole number.
+    * `ValueError`: the number is not positive.
+    """
+    from prime_nums import _AssertWholeNum
+    if factors is not None:
+        return factors
+    n_ = _AssertWholeNum(n)
+    if n_ < 1:
+        raise ValueError(f'a positive integer is required not {n_}')
+    if n_ == 1:
+        return {}
+    return GetPrimeFactors(n_)
+
+
+def UseSpfTable(table: 'SpfTable | str | PathLike | None') -> None:
+    """Registers a smallest-prime-factor table, either an `SpfTable` object
+    or the path to a table file, which `GetPrimeFactors` and `FactorRange`
+    use whenever it covers the requested numbers. Passing `None`
+    unregisters the current table. Without a call to this function, the
+    table at the path in the `SPF_TABLE` environment variable, if any, is
+    used.
+    """
+    global _spfTable
+    global _spfTableLoaded
+    from spf import SpfTable
+    if table is not None and not isinstance(table, SpfTable):
+        table = SpfTable.Open(table)
+    _spfTable = table
+    _spfTableLoaded = True
+
+
+def _GetSpfTable() -> 'SpfTable | None':
+    """Returns the registered smallest-prime-factor table or `None` if
+    there is not any.
+    """
+    global _spfTable
+    global _spfTableLoaded
+    if not _spfTableLoaded:
+        import os
+        _spfTableLoaded = True
+        path = os.environ.get('SPF_TABLE')
+        if path:
+            from spf import SpfTable
+            _spfTable = SpfTable.Open(path)
+    return _spfTable
+
+
+def _GetTrialPrimes() -> list[int]:
+    """Returns the primes less than `_TRIAL_LIMIT` which are used for
+    trial division.
+    """
+    global _trialPrimes
+    if not _trialPrimes:
+        from prime_nums import _GetBasePrimes
+        _trialPrimes = _GetBasePrimes(_TRIAL_LIMIT - 1)
+    return _trialPrimes
+
+
+def _GetPerfectPowerRoot(n: int) -> int | None:
+    """Returns the least `r` such that `n == r ** k` for some `k > 1` or
+    `None` if `n` is not a perfect power.
+    """
+    for k in range(n.bit_length(), 1, -1):
+        # Finding the integer k-th root by Newton's method...
+        x = 1 << -(-n.bit_length() // k)
+        while True:
+            y = ((k - 1) * x + n // x ** (k - 1)) // k
+            if y >= x:
+                break
+            x = y
+        if x > 1 and x ** k == n:
+            return x
+    return None
+
+
+def _PollardBrent(n: int, budget: int | None = None) -> int | None:
+    """Returns a non-trivial divisor of the odd composite `n` by Brent's
+    improvement of Pollard's rho method. Random starting points are
+    tried until one of them splits `n` or, if `budget` is provided, until
+    about `budget` steps are taken, in which case `None` is returned.
+    """
+    from math import gcd
+    from random import randrange
+    nSteps = 0
+    while True:
+        y = randrange(1, n)
+        c = randrange(1, n)
+        g = r = q = 1
+        while g == 1:
+            if budget is not None and nSteps > budget:
+                return None
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                # Multiplying the differences in batches to save gcds...
+                for _ in range(min(_RHO_BATCH, r - k)):
+                    y = (y * y + c) % n
+                    q = q * (x - y) % n
+                g = gcd(q, n)
+                k += _RHO_BATCH
+            nSteps += 2 * r
+            r <<= 1
+        if g == n:
+            # The batch overshot, backtracking one step at a time...
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = gcd(x - ys, n)
+        if g != n:
+            return g
@@ -0,0 +1,344 @@
+#
+# 
+#
+
+
+from array import array
+from ctypes import c_bool
+from typing import Generator
+
+
+_SCHEDULE: tuple[tuple[int, int], ...] = (
+    (2_000, 25,),
+    (11_000, 90,),
+    (50_000, 300,),
+    (250_000, 700,),
+    (1_000_000, 1_800,),
+    (3_000_000, 5_100,),)
+"""Pairs of stage 1 bounds and numbers of curves which are tried in
+order. They are the usual choices for factors of about 15, 20, 25, 30,
+35 and 40 digits.
+"""
+
+_B2_RATIO = 100
+"""The stage 2 bound as a multiple of the stage 1 bound."""
+
+_D = 105
+"""Half the giant step of stage 2. The baby steps are `2 * d * Q` for
+`d` in `1..D`.
+"""
+
+_CURVES_PER_TASK = 4
+"""The number of curves that a worker process runs for one submission."""
+
+_SCALAR_BITS = 1 << 16
+"""The least number of bits of every factor of the stage 1 scalar. Stage
+1 multiplies the point by one factor at a time and can give up between
+them.
+"""
+
+_POLL_STEPS = 1 << 10
+"""The number of giant steps of stage 2 between two checks of the stop
+flag.
+"""
+
+_stage1Scalars: dict[int, list[int]] = {}
+"""A cache from stage 1 bounds to the factors of the product of all prime
+powers up to them.
+"""
+
+_stage2Primes: dict[int, array] = {}
+"""A cache from the latest stage 1 bound to the primes of its stage 2
+range as an `array('I')`. The bounds only grow along `_SCHEDULE`, so the
+primes of the other bounds are dropped.
+"""
+
+_stop: c_bool | None = None
+"""The flag that `FindFactorECM` shares with its worker processes and
+sets once a factor is found, so that the running curves give up early.
+"""
+
+
+def FindFactorECM(
+        n: int,
+        workers: int | None = 1,
+        ) -> int:
+    """Returns a non-trivial divisor of the composite `n` by Lenstra's
+    elliptic curve method on Montgomery curves with Suyama's
+    parametrization, with a stage 1 and a baby-step giant-step stage 2.
+    The bounds grow along `_SCHEDULE` until a factor is found. If
+    `workers` is not one, the curves of every bound are run in that many
+    processes (`None` for all CPU cores).
+
+    `n` must be composite and must not be a perfect power, otherwise this
+    function may not return.
+    """
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+    from multiprocessing import Value
+    import os
+    if n % 2 == 0:
+        return 2
+    tasks = _IterCurveTasks(n)
+    if workers == 1:
+        for B1, sigmas in tasks:
+            d = _RunCurves_Proc(n, B1, sigmas)
+            if d:
+                return d
+    nWorkers = workers or os.cpu_count() or 1
+    stop = Value(c_bool, False, lock=False)
+    pPool = ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_InitCurveProc,
+        initargs=(stop,))
+    try:
+        pending = set()
+        while True:
+            # Keeping every worker busy...
+            while len(pending) < 2 * nWorkers:
+                B1, sigmas = next(tasks)
+                pending.add(pPool.submit(_RunCurves_Proc, n, B1, sigmas))
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                d = future.result()
+                if d:
+                    return d
+    finally:
+        # Stopping the running curves so that no core is left busy...
+        stop.value = True
+        pPool.shutdown(cancel_futures=True)
+
+
+def _InitCurveProc(stop: c_bool) -> None:
+    global _stop
+    _stop = stop
+
+
+def _IsStopped() -> bool:
+    """Checks whether the curves of this worker process must give up."""
+    return _stop is not None and _stop.value
+
+
+def _IterCurveTasks(n: int) -> Generator[tuple[int, list[int]], None, None]:
+    """Yields endless `(B1, sigmas)` pairs of batches of curves along
+    `_SCHEDULE`. The last bound is repeated forever.
+    """
+    from random import randrange
+    for B1, nCurves in _SCHEDULE:
+        for _ in range(0, nCurves, _CURVES_PER_TASK):
+            yield B1, [randrange(6, n) for _ in range(_CURVES_PER_TASK)]
+    B1 = _SCHEDULE[-1][0]
+    while True:
+        yield B1, [randrange(6, n) for _ in range(_CURVES_PER_TASK)]
+
+
+def _RunCurves_Proc(n: int, B1: int, sigmas: list[int]) -> int:
+    """Runs a batch of curves and returns the first divisor found or
+    zero.
+    """
+    for sigma in sigmas:
+        if _IsStopped():
+            break
+        d = _RunCurve(n, B1, sigma)
+        if d:
+            return d
+    return 0
+
+
+def _RunCurve(n: int, B1: int, sigma: int) -> int:
+    """Runs one curve of ECM on `n` with the stage 1 bound of `B1` and
+    Suyama's parameter of `sigma`. It returns a non-trivial divisor of
+    `n` or zero if the curve does not find any.
+    """
+    from math import gcd
+    # Setting up the curve and the starting point...
+    u = (sigma * sigma - 5) % n
+    v = 4 * sigma % n
+    x = pow(u, 3, n)
+    z = pow(v, 3, n)
+    # a24 = (A + 2) / 4 = (v - u)^3 (3u + v) / (16 u^3 v)
+    num = pow(v - u, 3, n) * (3 * u + v) % n
+    den = 16 * x * v % n
+    g = gcd(den, n)
+    if g != 1:
+        return g if g != n else 0
+    a24 = num * pow(den, -1, n) % n
+    # Stage 1...
+    for k in _GetStage1Scalars(B1):
+        if _IsStopped():
+            return 0
+        x, z = _Ladder(k, x, z, n, a24)
+    g = gcd(z, n)
+    if g != 1:
+        return g if g != n else 0
+    # Stage 2...
+    g = gcd(_Stage2(x, z, n, a24, B1), n)
+    return g if 1 < g < n else 0
+
+
+def _GetStage1Scalars(B1: int) -> list[int]:
+    """Returns the product of the greatest powers of all primes up to
+    `B1` that do not exceed `B1`, split into factors of at least
+    `_SCALAR_BITS` bits.
+    """
+    try:
+        return _stage1Scalars[B1]
+    except KeyError:
+        pass
+    from prime_nums import GetPrimeNums
+    scalars: list[int] = []
+    k = 1
+    for p in GetPrimeNums(B1):
+        pk = p
+        while pk * p <= B1:
+            pk *= p
+        k *= pk
+        if k.bit_length() >= _SCALAR_BITS:
+            scalars.append(k)
+            k = 1
+    if k > 1:
+        scalars.append(k)
+    _stage1Scalars[B1] = scalars
+    return scalars
+
+
+def _GetStage2Primes(B1: int) -> array:
+    """Returns the primes in `(B1, B2]`, the range of stage 2, as an
+    `array('I')`.
+    """
+    try:
+        return _stage2Primes[B1]
+    except KeyError:
+        pass
+    from prime_nums import GetPrimesInRange
+    primes = array('I', GetPrimesInRange(B1 + 1, _B2_RATIO * B1))
+    _stage2Primes.clear()
+    _stage2Primes[B1] = primes
+    return primes
+
+
+def _Stage2(x: int, z: int, n: int, a24: int, B1: int) -> int:
+    """Runs the standard continuation from the stage 1 point `Q = (x:z)`
+    and returns the product of `X([r]Q) Z([2d]Q) - X([2d]Q) Z([r]Q)` over
+    the primes `q = r + 2d` of the stage 2 range. It is divisible by a
+    prime factor `p` of `n` if the order of `Q` modulo `p` is a prime of
+    that range.
+    """
+    # Computing the baby steps S[d] = [2d]Q...
+    S = [(0, 0,)] * (_D + 1)
+    S[1] = _Double(x, z, n, a24)
+    S[2] = _Double(*S[1], n, a24)
+    for d in range(3, _D + 1):
+        S[d] = _Add(*S[d - 1], *S[1], *S[d - 2], n)
+    beta = [sx * sz % n for sx, sz in S]
+    # Computing the giant steps R = [r]Q and T = [r - 2D]Q...
+    r = B1 if B1 & 1 else B1 - 1
+    rx, rz = _Ladder(r, x, z, n, a24)
+    tx, tz = _Ladder(r - 2 * _D, x, z, n, a24)
+    g = 1
+    primes = _GetStage2Primes(B1)
+    idx = 0
+    nSteps = 0
+    while idx < len(primes):
+        nSteps += 1
+        if nSteps % _POLL_STEPS == 0 and _IsStopped():
+            break
+        alpha = rx * rz % n
+        top = r + 2 * _D
+        while idx < len(primes) and primes[idx] <= top:
+            sx, sz = S[(primes[idx] - r) >> 1]
+            g = g * ((rx - sx) * (rz + sz) - alpha + beta[
+                (primes[idx] - r) >> 1]) % n
+            idx += 1
+        (rx, rz), (tx, tz) = _Add(rx, rz, *S[_D], tx, tz, n), (rx, rz)
+        r = top
+    return g
+
+
+def _Double(x: int, z: int, n: int, a24: int) -> tuple[int, int]:
+    """Returns `[2]P` for `P = (x:z)` on the curve with `a24`."""
+    s = (x + z) * (x + z) % n
+    d = (x - z) * (x - z) % n
+    t = s - d
+    return s * d % n, t * (d + a24 * t) % n
+
+
+def _Add(
+        xp: int,
+        zp: int,
+        xq: int,
+        zq: int,
+        xd: int,
+        zd: int,
+        n: int,
+        ) -> tuple[int, int]:
+    """Returns `P + Q` given `P`, `Q` and their difference `P - Q`."""
+    u = (xp - zp) * (xq + zq)
+    v = (xp + zp) * (xq - zq)
+    s = (u + v) % n
+    d = (u - v) % n
+    return zd * s * s % n, xd * d * d % n
+
+
+def _Ladder(
+        k: int,
+        x: int,
+        z: int,
+        n: int,
+        a24: int,
+        ) -> tuple[int, int]:
+    """Returns `[k]P` for `P = (x:z)` and `k >= 1` by the Montgomery
+    ladder.
+    """
+    x0, z0 = x, z
+    x1, z1 = _Double(x, z, n, a24)
+    for bit in bin(k)[3:]:
+        # Inlining _Add and _Double of the ladder step...
+        u = (x0 - z0) * (x1 + z1)
+        v = (x0 + z0) * (x1 - z1)
+        s = (u + v) % n
+        d = (u - v) % n
+        if bit == '1':
+            xs, zs = x1, z1
+        else:
+            xs, zs = x0, z0
+        sq = (xs + zs) * (xs + zs) % n
+        dq = (xs - zs) * (xs - zs) % n
+        t = sq - dq
+        xa, za = z * s * s % n, x * d * d % n
+        xb, zb = sq * dq % n, t * (dq + a24 * t) % n
+        if bit == '1':
+            x0, z0, x1, z1 = xa, za, xb, zb
+        else:
+            x0, z0, x1, z1 = xb, zb, xa, za
+    return x0, z0
+
+
+def main() -> None:
+    from random import getrandbits
+    from time import perf_counter
+    from primality import IsPrime
+
+    def RandomPrime(nDigits: int) -> int:
+        while True:
+            p = 10 ** (nDigits - 1) + getrandbits(4 * nDigits) % (
+                9 * 10 ** (nDigits - 1))
+            if IsPrime(p):
+                return p
+
+    nDigits = 40
+    for workers in (1, None,):
+        durs: list[float] = []
+        for _ in range(3):
+            p = RandomPrime(nDigits // 2)
+            q = RandomPrime(nDigits - nDigits // 2)
+            startTime = perf_counter()
+            d = FindFactorECM(p * q, workers)
+            durs.append(perf_counter() - startTime)
+            assert d in (p, q,)
+            print(f'{p * q} = {p} X {q} in {durs[-1]:.2f} seconds')
+        print(f'{nDigits}-digit composites, workers={workers}: '
+            f'{sum(durs) / len(durs):.2f} seconds on average\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,506 @@
+#
+# 
+#
+
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+
+_DEFAULT_PORT = 8765
+"""The default TCP port of the factorization service."""
+
+_BATCH_WINDOW = 0.002
+"""The time in seconds that the service waits for more requests before
+it sends a batch of factorizations to the process pool.
+"""
+
+_MAX_BATCH = 1 << 12
+"""The greatest number of integers in one batch."""
+
+_INLINE_LIMIT = 1 << 32
+"""Integers less than this bound are factored in the event loop, because
+it takes less time than a round trip to a worker process.
+"""
+
+_MAX_PRIME_LIMIT = 1 << 26
+"""The greatest limit of a `primes` request, which bounds the size of
+its response to about 40 megabytes.
+"""
+
+_ENCODE_CHUNK = 1 << 14
+"""The number of primes of a `primes` response that are encoded at once.
+One call of `json.dumps` on all of them would hold the GIL for most of a
+second and block the event loop.
+"""
+
+_MAX_LINE = 1 << 20
+"""The greatest length of a request line in bytes."""
+
+_MAX_RESPONSE = 1 << 26
+"""The greatest length of a response line in bytes, which holds the
+response of a `primes` request up to `_MAX_PRIME_LIMIT`.
+"""
+
+
+class FactorServer:
+    """An asyncio TCP service of JSON lines which answers `GetPrimeFactors`
+    and `GetPrimeNums` from the process-wide caches of this process, so
+    its clients share warm caches and prime tables. Every request is an
+    object like `{"id": 1, "op": "factor", "n": 360}` or
+    `{"id": 2, "op": "primes", "n": 100}` and its response is
+    `{"id": 1, "factors": [[2, 3], [3, 2], [5, 1]]}`,
+    `{"id": 2, "primes": [2, 3, ...]}` or
+    `{"id": 1, "error": "...", "type": "ValueError"}`. Responses of one
+    connection may come out of order.
+
+    The factorizations that miss the cache are collected for
+    `batchWindow` seconds and sent to a pool of `workers` processes
+    (`None` for all CPU cores) in one batch. Concurrent requests for the
+    same integer share one factorization.
+    """
+
+    def __init__(
+            self,
+            host: str = '127.0.0.1',
+            port: int = _DEFAULT_PORT,
+            workers: int | None = None,
+            batchWindow: float = _BATCH_WINDOW,
+            ) -> None:
+        self._host = host
+        self._port = port
+        self._workers = workers
+        self._batchWindow = batchWindow
+        self._server: asyncio.Server | None = None
+        self._pPool: ProcessPoolExecutor | None = None
+        self._queue: asyncio.Queue[int] = asyncio.Queue()
+        self._pending: dict[int, asyncio.Future] = {}
+        self._batcher: asyncio.Task | None = None
+        self._jobs: set[asyncio.Task] = set()
+        self._nWorkers = 1
+
+    @property
+    def port(self) -> int:
+        """The TCP port that the service listens on."""
+        if self._server is None:
+            return self._port
+        return self._server.sockets[0].getsockname()[1]
+
+    async def Start(self) -> None:
+        """Starts the process pool and listening for connections."""
+        import os
+        from divisors import _InitFactorProc
+        _InitFactorProc()
+        self._pPool = ProcessPoolExecutor(
+            max_workers=self._workers,
+            initializer=_InitFactorProc)
+        self._nWorkers = self._workers or os.cpu_count() or 1
+        self._batcher = asyncio.create_task(self._RunBatches())
+        self._server = await asyncio.start_server(
+            self._HandleClient,
+            self._host,
+            self._port,
+            limit=_MAX_LINE)
+
+    async def Serve(self) -> None:
+        """Starts the service and serves until it is cancelled."""
+        await self.Start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.Close()
+
+    async def Close(self) -> None:
+        """Stops listening, drops the pending factorizations and shuts the
+        process pool down.
+        """
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        if self._batcher is not None:
+            self._batcher.cancel()
+            self._batcher = None
+        for job in list(self._jobs):
+            job.cancel()
+        for future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+        if self._pPool is not None:
+            self._pPool.shutdown(wait=False, cancel_futures=True)
+            self._pPool = None
+
+    async def __aenter__(self) -> 'FactorServer':
+        await self.Start()
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        await self.Close()
+
+    async def _HandleClient(
+            self,
+            reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter,
+            ) -> None:
+        tasks: set[asyncio.Task] = set()
+        try:
+            while True:
+                line, whole = await _ReadLine(reader)
+                if not line:
+                    break
+                if whole:
+                    coro = self._Respond(line, writer)
+                else:
+                    coro = self._Reject(line, writer)
+                task = asyncio.create_task(coro)
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            # Answering the requests before the end of the input...
+            if tasks:
+                await asyncio.gather(*tasks)
+        except ConnectionError:
+            # The client has gone away...
+            pass
+        except asyncio.CancelledError:
+            # The service is closing. Ending normally because the stream
+            # protocol of Python 3.11 reports cancelled handlers as errors...
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _Respond(
+            self,
+            line: bytes,
+            writer: asyncio.StreamWriter,
+            ) -> None:
+        import json
+        id_ = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise TypeError('a request must be a JSON object')
+            id_ = request.get('id')
+            match request.get('op'):
+                case 'factor':
+                    factors = await self._Factor(request.get('n'))
+                    response = {'id': id_, 'factors': list(factors.items())}
+                case 'primes':
+                    # Writing the response encoded by the executor...
+                    data = await self._GetPrimes(id_, request.get('n'))
+                    writer.write(data)
+                    await writer.drain()
+                    return
+                case op:
+                    raise ValueError(f'unknown operation: {op}')
+        except asyncio.CancelledError:
+            raise
+        except Exception as err:
+            response = {
+                'id': id_,
+                'error': str(err),
+                'type': type(err).__name__}
+        writer.write(json.dumps(response).encode() + b'\n')
+        await writer.drain()
+
+    async def _Reject(
+            self,
+            head: bytes,
+            writer: asyncio.StreamWriter,
+            ) -> None:
+        """Answers a request line longer than `_MAX_LINE` whose first
+        bytes are `head` with an error.
+        """
+        import json
+        response = {
+            'id': _GetLineId(head),
+            'error': f'the request is longer than {_MAX_LINE} bytes',
+            'type': 'ValueError'}
+        writer.write(json.dumps(response).encode() + b'\n')
+        await writer.drain()
+
+    async def _Factor(self, n: Any) -> dict[int, int]:
+        from cache import EstimateFactorsBytes, GetFactorCache
+        from divisors import _FactorUncached
+        from prime_nums import _AssertPrimeLimit
+        n = _AssertPrimeLimit(n)
+        cache = GetFactorCache()
+        cached = cache.Get(n)
+        if cached is not None:
+            return cached
+        if n < _INLINE_LIMIT:
+            # Factoring without GetPrimeFactors, which would count a
+            # second miss...
+            factors = _FactorUncached(n)
+            cache.Put(n, dict(factors), EstimateFactorsBytes(n, factors))
+            return factors
+        future = self._pending.get(n)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[n] = future
+            self._queue.put_nowait(n)
+        # Shielding the shared future from the cancellation of one waiter...
+        return await asyncio.shield(future)
+
+    async def _GetPrimes(self, id_: Any, n: Any) -> bytes:
+        """Returns the encoded response line of a `primes` request. Both
+        the primes and their JSON are computed in the default executor,
+        so the event loop is not blocked by a large response.
+        """
+        from prime_nums import _AssertPrimeLimit
+        n = _AssertPrimeLimit(n)
+        if n > _MAX_PRIME_LIMIT:
+            raise ValueError(f'the limit of a primes request must not exceed '
+                f'{_MAX_PRIME_LIMIT} not {n}')
+        return await asyncio.get_running_loop().run_in_executor(
+            None,
+            _EncodePrimes,
+            id_,
+            n)
+
+    async def _RunBatches(self) -> None:
+        """Collects the integers of the queue for the batch window and
+        sends them to the process pool in one chunk per worker.
+        """
+        while True:
+            nums = [await self._queue.get()]
+            await asyncio.sleep(self._batchWindow)
+            while not self._queue.empty() and len(nums) < _MAX_BATCH:
+                nums.append(self._queue.get_nowait())
+            chunkSize = -(-len(nums) // self._nWorkers)
+            for idx in range(0, len(nums), chunkSize):
+                job = asyncio.create_task(
+                    self._RunJob(nums[idx:idx + chunkSize]))
+                self._jobs.add(job)
+                job.add_done_callback(self._jobs.discard)
+
+    async def _RunJob(self, nums: list[int]) -> None:
+        from cache import EstimateFactorsBytes, GetFactorCache
+        from divisors import _FactorChunk_Proc
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self._pPool,
+                _FactorChunk_Proc,
+                nums)
+        except Exception as err:
+            for n in nums:
+                future = self._pending.pop(n, None)
+                if future is not None and not future.done():
+                    future.set_exception(err)
+            return
+        cache = GetFactorCache()
+        for n, factors in zip(nums, results):
+            cache.Put(n, dict(factors), EstimateFactorsBytes(n, factors))
+            future = self._pending.pop(n, None)
+            if future is not None and not future.done():
+                future.set_result(factors)
+
+
+def _EncodePrimes(id_: Any, n: int) -> bytes:
+    """Returns the response line of a `primes` request with the id of
+    `id_` and the limit of `n`.
+    """
+    import json
+    from prime_nums import GetPrimeNums
+    primes = list(GetPrimeNums(n))
+    body = b', '.join(
+        ', '.join(map(str, primes[idx:idx + _ENCODE_CHUNK])).encode()
+        for idx in range(0, len(primes), _ENCODE_CHUNK))
+    return b''.join((
+        f'{{"id": {json.dumps(id_)}, "primes": ['.encode(),
+        body,
+        b']}\n',))
+
+
+async def _ReadLine(reader: asyncio.StreamReader) -> tuple[bytes, bool]:
+    """Reads a line like `StreamReader.readline` and returns it along with
+    `True`. A line longer than the limit of `reader` is skipped to its end
+    and only its first bytes are returned, along with `False`, so that
+    the lines after it can still be read. At the end of the stream it
+    returns `(b'', True)`.
+    """
+    try:
+        return await reader.readuntil(b'\n'), True
+    except asyncio.IncompleteReadError as err:
+        return err.partial, True
+    except asyncio.LimitOverrunError as err:
+        head = await reader.readexactly(err.consumed)
+    while True:
+        try:
+            await reader.readuntil(b'\n')
+            return head, False
+        except asyncio.IncompleteReadError:
+            return head, False
+        except asyncio.LimitOverrunError as err:
+            await reader.readexactly(err.consumed)
+
+
+def _GetLineId(head: bytes) -> int | None:
+    """Returns the ID of a request or response from the first bytes of
+    its line, or `None` if it is not found.
+    """
+    import re
+    match = re.match(rb'\s*\{\s*"id"\s*:\s*(-?\d+)', head)
+    return None if match is None else int(match[1])
+
+
+class FactorClient:
+    """An asyncio client of `FactorServer` which sends the requests of
+    concurrent coroutines over one connection.
+    """
+
+    def __init__(
+            self,
+            reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter,
+            ) -> None:
+        """Wraps a connection. Use `FactorClient.Connect` instead."""
+        self._reader = reader
+        self._writer = writer
+        self._nextId = 0
+        self._futures: dict[int, asyncio.Future] = {}
+        self._readerTask = asyncio.create_task(self._ReadResponses())
+
+    @classmethod
+    async def Connect(
+            cls,
+            host: str = '127.0.0.1',
+            port: int = _DEFAULT_PORT,
+            ) -> 'FactorClient':
+        """Connects to the service at `host` and `port`.
+
+        #### Exceptions:
+        * `OSError`: the connection fails.
+        """
+        reader, writer = await asyncio.open_connection(
+            host,
+            port,
+            limit=_MAX_RESPONSE)
+        return cls(reader, writer)
+
+    async def GetPrimeFactors(self, n: int) -> dict[int, int]:
+        """Returns the prime factors of `n` like `GetPrimeFactors`.
+
+        #### Exceptions:
+        * `TypeError`: the argument is not a whole number.
+        * `ValueError`: the number is not greater than one.
+        * `ConnectionError`: the connection is lost.
+        """
+        from collections import defaultdict
+        response = await self._Request('factor', n)
+        return defaultdict(int, response['factors'])
+
+    async def GetPrimeNums(self, n: int) -> list[int]:
+        """Returns all prime numbers up to `n` like `GetPrimeNums`.
+
+        #### Exceptions:
+        * `TypeError`: the argument is not a whole number.
+        * `ValueError`: the number is not greater than one or exceeds the
+        limit of the service.
+        * `ConnectionError`: the connection is lost.
+        """
+        response = await self._Request('primes', n)
+        return response['primes']
+
+    async def close(self) -> None:
+        """Closes the connection."""
+        self._readerTask.cancel()
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+
+    async def __aenter__(self) -> 'FactorClient':
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        await self.close()
+
+    async def _Request(self, op: str, n: int) -> dict[str, Any]:
+        import json
+        if self._readerTask.done():
+            raise ConnectionError('the connection to the service is lost')
+        id_ = self._nextId
+        self._nextId += 1
+        future = asyncio.get_running_loop().create_future()
+        self._futures[id_] = future
+        try:
+            self._writer.write(
+                json.dumps({'id': id_, 'op': op, 'n': n}).encode() + b'\n')
+            await self._writer.drain()
+            response = await future
+        finally:
+            self._futures.pop(id_, None)
+        if 'error' in response:
+            match response.get('type'):
+                case 'TypeError':
+                    raise TypeError(response['error'])
+                case 'ValueError':
+                    raise ValueError(response['error'])
+                case _:
+                    raise RuntimeError(response['error'])
+        return response
+
+    async def _ReadResponses(self) -> None:
+        import json
+        try:
+            while True:
+                line, whole = await _ReadLine(self._reader)
+                if not line:
+                    break
+                if whole:
+                    response = json.loads(line)
+                else:
+                    # Failing only the request of a response too long...
+                    response = {
+                        'id': _GetLineId(line),
+                        'error': 'the response is longer than the '
+                            'line limit of the client',
+                        'type': 'ValueError'}
+                future = self._futures.get(response.get('id'))
+                if future is not None and not future.done():
+                    future.set_result(response)
+        except (ConnectionError, ValueError,):
+            pass
+        finally:
+            for future in self._futures.values():
+                if not future.done():
+                    future.set_exception(ConnectionError(
+                        'the connection to the service is lost'))
+
+
+def main() -> None:
+    """Serves on the default port if there is no argument, otherwise
+    factors the arguments through the service.
+    """
+    import sys
+    from divisors import FormatFactors
+
+    async def Factor(nums: list[str]) -> None:
+        async with await FactorClient.Connect() as client:
+            results = await asyncio.gather(
+                *[client.GetPrimeFactors(int(num)) for num in nums],
+                return_exceptions=True)
+        for num, factors in zip(nums, results):
+            if isinstance(factors, Exception):
+                print(f'{num}: {factors}')
+            else:
+                print(f'{num} = {FormatFactors(factors)}')
+
+    try:
+        if len(sys.argv) > 1:
+            asyncio.run(Factor(sys.argv[1:]))
+        else:
+            asyncio.run(FactorServer().Serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
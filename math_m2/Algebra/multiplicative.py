@@ -0,0 +1,187 @@
+#
+# 
+#
+
+
+from typing import Any, Generator
+
+
+_SEGMENT_SIZE = 1 << 20
+"""The default number of integers in one segment of
+`IterMultiplicativeSegments`.
+"""
+
+
+def SieveMultiplicative(n: int) -> dict[str, Any]:
+    """Computes Euler's totient, the Mobius function, the number of
+    distinct prime factors and the number of divisors of every integer
+    in `[0, n]` in one pass. It returns a mapping from `'phi'`, `'mu'`,
+    `'omega'` and `'sigma0'` to buffers indexed by the integers, with
+    zeros at index zero. The buffers are NumPy arrays of `int64`, `int8`,
+    `uint8` and `uint32` if NumPy is available, otherwise `array.array`
+    objects of the same types.
+
+    #### Exceptions:
+    * `TypeError`: the argument is not a whole number.
+    * `ValueError`: the number is not greater than one.
+    """
+    import math
+    from prime_nums import _AssertPrimeLimit, _GetBasePrimes
+    n_ = _AssertPrimeLimit(n)
+    basePrimes = _GetBasePrimes(math.isqrt(n_))
+    # Filling the buffers segment by segment to bound the temporaries...
+    buffers = None
+    for start in range(1, n_ + 1, _SEGMENT_SIZE):
+        stop = min(start + _SEGMENT_SIZE, n_ + 1)
+        segment = _SieveSegment(start, stop, basePrimes)
+        if buffers is None:
+            buffers = {
+                name: _AllocBuffer(buffer, n_ + 1)
+                for name, buffer in segment.items()}
+        for name, buffer in segment.items():
+            buffers[name][start:stop] = buffer
+    return buffers
+
+
+def _AllocBuffer(like: Any, size: int) -> Any:
+    """Returns a zero-filled buffer of `size` elements of the same type as
+    `like`.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        from array import array
+        return array(like.typecode, bytes(like.itemsize * size))
+    return np.zeros(size, dtype=like.dtype)
+
+
+def IterMultiplicativeSegments(
+        lo: int,
+        hi: int,
+        segmentSize: int = _SEGMENT_SIZE,
+        ) -> Generator[tuple[int, dict[str, Any]], None, None]:
+    """Yields `(start, buffers)` pairs which cover the closed interval
+    `[lo, hi]` segment by segment, for ranges that do not fit in memory.
+    `buffers` is laid out like the output of `SieveMultiplicative` but
+    its index `i` stands for the integer `start + i`.
+
+    #### Exceptions:
+    * `TypeError`: a bound is not a whole number.
+    * `ValueError`: `lo` is not positive, `lo` is greater than `hi` or
+    the segment size is not positive.
+    """
+    import math
+    from prime_nums import _AssertWholeNum, _GetBasePrimes
+    # Checking the arguments...
+    lo = _AssertWholeNum(lo)
+    hi = _AssertWholeNum(hi)
+    if lo < 1:
+        raise ValueError(f'a positive lower bound is required not {lo}')
+    if lo > hi:
+        raise ValueError(f'the interval of [{lo}, {hi}] is empty')
+    if segmentSize < 1:
+        raise ValueError(f'a positive segment size is required not '
+            f'{segmentSize}')
+    # Sieving segments...
+    basePrimes = _GetBasePrimes(math.isqrt(hi))
+    for start in range(lo, hi + 1, segmentSize):
+        stop = min(start + segmentSize, hi + 1)
+        yield start, _SieveSegment(start, stop, basePrimes)
+
+
+def _SieveSegment(
+        start: int,
+        stop: int,
+        basePrimes: list[int],
+        ) -> dict[str, Any]:
+    """Computes the functions for `[start, stop)` where `start` is
+    positive and `basePrimes` are all primes up to `isqrt(stop - 1)`.
+
+    Every integer keeps a remaining cofactor. The multiples of each base
+    prime `p` and of its powers get the exponent of `p`, which updates the
+    functions and is divided out of the cofactor. A cofactor greater than
+    one at the end is a single prime above the square root.
+    """
+    try:
+        import numpy
+    except ImportError:
+        numpy = None
+    if numpy is None:
+        return _SieveSegment_Python(start, stop, basePrimes)
+    return _SieveSegment_NumPy(start, stop, basePrimes)
+
+
+def _SieveSegment_NumPy(
+        start: int,
+        stop: int,
+        basePrimes: list[int],
+        ) -> dict[str, Any]:
+    import numpy as np
+    size = stop - start
+    rem = np.arange(start, stop, dtype=np.int64)
+    phi = rem.copy()
+    mu = np.ones(size, dtype=np.int8)
+    omega = np.zeros(size, dtype=np.uint8)
+    sigma0 = np.ones(size, dtype=np.uint32)
+    for p in basePrimes:
+        first = -start % p
+        if first >= size:
+            continue
+        sl = slice(first, None, p)
+        rem[sl] //= p
+        phi[sl] -= phi[sl] // p
+        mu[sl] = -mu[sl]
+        omega[sl] += 1
+        # Finding the exponents of p by the multiples of its powers...
+        nDivs = np.full(len(range(first, size, p)), 2, dtype=np.uint32)
+        pk = p * p
+        while pk < stop:
+            firstK = -start % pk
+            if firstK < size:
+                rem[firstK::pk] //= p
+                mu[firstK::pk] = 0
+                nDivs[(firstK - first) // p::pk // p] += 1
+            pk *= p
+        sigma0[sl] *= nDivs
+    # Handling the prime factors above the square root...
+    big = rem > 1
+    phi[big] -= phi[big] // rem[big]
+    mu[big] = -mu[big]
+    omega[big] += 1
+    sigma0[big] *= 2
+    return {'phi': phi, 'mu': mu, 'omega': omega, 'sigma0': sigma0}
+
+
+def _SieveSegment_Python(
+        start: int,
+        stop: int,
+        basePrimes: list[int],
+        ) -> dict[str, Any]:
+    from array import array
+    size = stop - start
+    rem = list(range(start, stop))
+    phi = array('q', rem)
+    mu = array('b', [1]) * size
+    omega = array('B', [0]) * size
+    sigma0 = array('I', [1]) * size
+    for p in basePrimes:
+        for idx in range(-start % p, size, p):
+            # Dividing out p and counting its exponent...
+            m = rem[idx] // p
+            e = 1
+            while m % p == 0:
+                m //= p
+                e += 1
+            rem[idx] = m
+            phi[idx] -= phi[idx] // p
+            mu[idx] = 0 if e > 1 else -mu[idx]
+            omega[idx] += 1
+            sigma0[idx] *= e + 1
+    # Handling the prime factors above the square root...
+    for idx, m in enumerate(rem):
+        if m > 1:
+            phi[idx] -= phi[idx] // m
+            mu[idx] = -mu[idx]
+            omega[idx] += 1
+            sigma0[idx] *= 2
+    return {'phi': phi, 'mu': mu, 'omega': omega, 'sigma0': sigma0}
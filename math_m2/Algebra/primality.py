@@ -0,0 +1,176 @@
+#
+# 
+#
+
+
+from typing import Generator, Iterable
+
+
+_SMALL_PRIMES: tuple[int, ...] = (
+    2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67,
+    71, 73, 79, 83, 89, 97,)
+"""All prime numbers less than 100 which are used for trial division
+before the probabilistic tests.
+"""
+
+_SMALL_PRIMORIAL = 2305567963945518424753102147331756070
+"""The product of `_SMALL_PRIMES`. A single `gcd` against it replaces
+trial division by every small prime.
+"""
+
+_SMALL_LIMIT = 101 * 101
+"""Integers below this bound that have no factor in `_SMALL_PRIMES` are
+primes.
+"""
+
+_MR_BASES: tuple[tuple[int, tuple[int, ...]], ...] = (
+    (2_047, (2,),),
+    (1_373_653, (2, 3,),),
+    (25_326_001, (2, 3, 5,),),
+    (3_215_031_751, (2, 3, 5, 7,),),
+    (2_152_302_898_747, (2, 3, 5, 7, 11,),),
+    (3_474_749_660_383, (2, 3, 5, 7, 11, 13,),),
+    (341_550_071_728_321, (2, 3, 5, 7, 11, 13, 17,),),
+    (1 << 64, (2, 325, 9375, 28178, 450775, 9780504, 1795265022,),),)
+"""Pairs of bounds and Miller-Rabin bases that are deterministic for
+every integer below the bound. The last set is Jim Sinclair's seven
+bases which cover all 64-bit integers.
+"""
+
+
+def IsPrime(n: int) -> bool:
+    """Determines whether `n` is a prime number or not. The answer is
+    exact for all integers below 2^64 by a deterministic Miller-Rabin
+    test. Greater integers go through the Baillie-PSW test which has no
+    known counterexample.
+
+    #### Exceptions:
+    * `TypeError`: the argument is not a whole number.
+    """
+    from prime_nums import _AssertWholeNum
+    return _IsPrime(_AssertWholeNum(n))
+
+
+def IsPrimeMany(nums: Iterable[int]) -> Generator[bool, None, None]:
+    """Yields whether each integer of `nums` is a prime number or not, in
+    order. Candidates with a factor below 100 are rejected by one `gcd`
+    before any modular exponentiation is done.
+
+    #### Exceptions:
+    * `TypeError`: an element is not a whole number.
+    """
+    from math import gcd
+    from prime_nums import _AssertWholeNum
+    for num in nums:
+        n = _AssertWholeNum(num)
+        if n < _SMALL_LIMIT:
+            yield n > 1 and (
+                gcd(n, _SMALL_PRIMORIAL) == 1 or n in _SMALL_PRIMES)
+        elif gcd(n, _SMALL_PRIMORIAL) != 1:
+            yield False
+        else:
+            yield _IsProbablePrime(n)
+
+
+def _IsPrime(n: int) -> bool:
+    """`IsPrime` without checking the argument."""
+    from math import gcd
+    if n < _SMALL_LIMIT:
+        return n > 1 and (
+            gcd(n, _SMALL_PRIMORIAL) == 1 or n in _SMALL_PRIMES)
+    if gcd(n, _SMALL_PRIMORIAL) != 1:
+        return False
+    return _IsProbablePrime(n)
+
+
+def _IsProbablePrime(n: int) -> bool:
+    """Runs the strong probable prime tests on an odd `n` which has no
+    factor below 100.
+    """
+    for bound, bases in _MR_BASES:
+        if n < bound:
+            return _IsStrongPrp(n, bases)
+    return _IsStrongPrp(n, (2,)) and _IsStrongLucasPrp(n)
+
+
+def _IsStrongPrp(n: int, bases: tuple[int, ...]) -> bool:
+    """Determines whether odd `n > 2` is a strong probable prime to all of
+    `bases` (Miller-Rabin).
+    """
+    d = n - 1
+    s = (d & -d).bit_length() - 1
+    d >>= s
+    for a in bases:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def _IsStrongLucasPrp(n: int) -> bool:
+    """Determines whether odd `n` is a strong Lucas probable prime with the
+    parameters of Selfridge's method A.
+    """
+    import math
+    # Finding D in 5, -7, 9, -11, ... with Jacobi (D/n) = -1...
+    if math.isqrt(n) ** 2 == n:
+        return False
+    D = 5
+    while True:
+        j = _Jacobi(D, n)
+        if j == -1:
+            break
+        if j == 0 and abs(D) != n:
+            return False
+        D = -D - 2 if D > 0 else -D + 2
+    P = 1
+    Q = (1 - D) // 4
+    # Writing n + 1 = d * 2^s...
+    d = n + 1
+    s = (d & -d).bit_length() - 1
+    d >>= s
+    # Computing U(d), V(d) and Q^d by the binary expansion of d...
+    U, V, Qk = 1, P, Q % n
+    for bit in bin(d)[3:]:
+        U = U * V % n
+        V = (V * V - 2 * Qk) % n
+        Qk = Qk * Qk % n
+        if bit == '1':
+            U, V = P * U + V, D * U + P * V
+            if U & 1:
+                U += n
+            if V & 1:
+                V += n
+            U = (U >> 1) % n
+            V = (V >> 1) % n
+            Qk = Qk * Q % n
+    if U == 0 or V == 0:
+        return True
+    for _ in range(s - 1):
+        V = (V * V - 2 * Qk) % n
+        if V == 0:
+            return True
+        Qk = Qk * Qk % n
+    return False
+
+
+def _Jacobi(a: int, n: int) -> int:
+    """Returns the Jacobi symbol (a/n) for odd positive `n`."""
+    a %= n
+    result = 1
+    while a:
+        while not a & 1:
+            a >>= 1
+            if n & 7 in (3, 5,):
+                result = -result
+        a, n = n, a
+        if a & 3 == 3 and n & 3 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
@@ -3,17 +3,360 @@
 #
 
 
-from typing import Generator
+from itertools import compress, islice
+from os import PathLike
+from typing import Generator, TYPE_CHECKING
 
+if TYPE_CHECKING:
+    from prime_table import PrimeTable
 
-def GetPrimeNums(n: int) -> Generator[int, None, None]:
-    """Yields all prime numbers less than or equal to `n`.
+
+_SEGMENT_SIZE = 1 << 18
+"""The number of odd integers that the segmented sieve crosses off in one
+block. One byte is used for each of them so that a block fits into the L2
+cache of common CPUs.
+"""
+
+_ARRAY_SEGMENT_SIZE = 1 << 20
+"""The number of odd integers in one block of `GetPrimeArray`. Whole
+ranges are sieved with fewer, larger blocks because the loop over the
+base primes of every block costs more than the cache misses.
+"""
+
+_primeTable: 'PrimeTable | None' = None
+"""The prime table registered for `GetPrimeNums`."""
+
+_primeTableLoaded = False
+"""Whether `_primeTable` has been set explicitly or from the environment."""
+
+
+def GetPrimeNums(
+        n: int,
+        workers: int | None = 1,
+        ) -> Generator[int, None, None]:
+    """Yields all prime numbers less than or equal to `n`. If a prime
+    table has been registered through `UsePrimeTable` and covers `n`, the
+    primes are read from the table instead of being sieved. Otherwise if
+    `workers` is not one, the range is sieved in that many processes
+    (`None` for all CPU cores) by `GetPrimeNumsParallel`. Otherwise the
+    primes come from the process-wide prime cache, which is grown as
+    needed up to its memory cap.
+
+    #### Exceptions:
+    * `TypeError`: the argument is not a whole number.
+    * `ValueError`: the number is not greater than one.
+    """
+    # Checking the argument...
+    n_ = _AssertPrimeLimit(n)
+    # Computing primes...
+    table = _GetPrimeTable()
+    if table is not None and table.Covers(n_):
+        yield from table.GetPrimes(n_)
+    elif workers != 1:
+        from prime_parallel import GetPrimeNumsParallel
+        yield from GetPrimeNumsParallel(n_, workers)
+    else:
+        from cache import GetPrimeCache
+        yield from GetPrimeCache().GetPrimes(n_)
+
+
+def GetPrimeArray(n: int) -> 'numpy.ndarray | array[int]':
+    """Returns all prime numbers less than or equal to `n` in one
+    contiguous buffer without creating a Python object per prime: an
+    `int64` NumPy array if NumPy is available, otherwise an
+    `array('Q')`. A registered prime table that covers `n` is read
+    instead of sieving.
 
     #### Exceptions:
     * `TypeError`: the argument is not a whole number.
     * `ValueError`: the number is not greater than one.
     """
     # Checking the argument...
+    n_ = _AssertPrimeLimit(n)
+    # Computing primes...
+    try:
+        import numpy
+    except ImportError:
+        numpy = None
+    table = _GetPrimeTable()
+    if table is not None and table.Covers(n_):
+        return table.GetPrimeArray(n_)
+    if numpy is None or n_ >= (1 << 63):
+        return _GetPrimeArray_Python(n_)
+    return _GetPrimeArray_NumPy(n_)
+
+
+def _GetPrimeArray_Python(n: int) -> 'array[int]':
+    """The pure Python implementation of `GetPrimeArray` for `n >= 2`."""
+    from array import array
+    primes = array('Q', [2])
+    for low, segment in _SieveSegments(
+            3,
+            n + 1,
+            segmentSize=_ARRAY_SEGMENT_SIZE):
+        primes.extend(compress(
+            range(low, low + 2 * len(segment), 2),
+            segment))
+    return primes
+
+
+def _GetPrimeArray_NumPy(n: int) -> 'numpy.ndarray':
+    """The NumPy implementation of `GetPrimeArray` for `2 <= n < 2 ** 63`.
+    The segments of `_SieveSegments` are crossed off by slice assignment
+    as usual, and their non-zero indices are turned into primes by whole
+    array operations.
+    """
+    import numpy as np
+    chunks = [np.array([2], dtype=np.int64)]
+    for low, segment in _SieveSegments(
+            3,
+            n + 1,
+            segmentSize=_ARRAY_SEGMENT_SIZE):
+        idx = np.flatnonzero(np.frombuffer(segment, dtype=np.uint8))
+        chunks.append(idx.astype(np.int64) * 2 + low)
+    return np.concatenate(chunks)
+
+
+def GetPrimesInRange(a: int, b: int) -> Generator[int, None, None]:
+    """Yields all prime numbers in the closed interval `[a, b]`. Only the
+    window itself is sieved, by the primes up to the square root of `b`,
+    so the cost does not depend on how large `a` is. A registered prime
+    table is used if it covers `b`.
+
+    #### Exceptions:
+    * `TypeError`: an argument is not a whole number.
+    * `ValueError`: `a` is greater than `b`.
+    """
+    # Checking the arguments...
+    a_ = _AssertWholeNum(a)
+    b_ = _AssertWholeNum(b)
+    if a_ > b_:
+        raise ValueError(f'the interval of [{a_}, {b_}] is empty')
+    # Computing primes...
+    if b_ < 2:
+        return
+    table = _GetPrimeTable()
+    if table is not None and table.Covers(b_):
+        yield from table.GetPrimesInRange(a_, b_)
+    else:
+        yield from _IterSegmentPrimes(a_, b_ + 1)
+
+
+def IterPrimeNums(start: int = 2) -> Generator[int, None, None]:
+    """Yields all prime numbers greater than or equal to `start` without
+    an upper bound. The range is sieved in rolling blocks and only the
+    primes up to the square root of the current block are kept, so the
+    memory grows as the square root of the greatest yielded prime.
+
+    #### Exceptions:
+    * `TypeError`: the argument is not a whole number.
+    * `ValueError`: the number is not greater than one.
+    """
+    import math
+    # Checking the argument...
+    low = _AssertPrimeLimit(start)
+    # Computing primes...
+    if low == 2:
+        yield 2
+    low |= 1
+    baseLimit = 0
+    basePrimes: list[int] = []
+    while True:
+        high = low + 2 * _SEGMENT_SIZE
+        sqrt = math.isqrt(high - 1)
+        if sqrt > baseLimit:
+            # Doubling the base primes so that they are sieved again only
+            # O(log n) times...
+            baseLimit = max(sqrt, 2 * baseLimit)
+            basePrimes = _GetBasePrimes(baseLimit)
+        for segLow, segment in _SieveSegments(low, high, basePrimes):
+            yield from compress(
+                range(segLow, segLow + 2 * len(segment), 2),
+                segment)
+        low = high
+
+
+def PrimeCount(n: int) -> int:
+    """Returns the number of prime numbers less than or equal to `n`,
+    pi(n), by the Lucy_Hedgehog algorithm in O(n^(3/4)) time and
+    O(n^(1/2)) memory without enumerating the primes. If NumPy is
+    available, the updates of every prime are vectorized.
+
+    #### Exceptions:
+    * `TypeError`: the argument is not a whole number.
+    """
+    # Checking the argument...
+    n_ = _AssertWholeNum(n)
+    if n_ < 2:
+        return 0
+    # Counting primes...
+    try:
+        import numpy
+    except ImportError:
+        numpy = None
+    if numpy is not None and n_ < (1 << 62):
+        return _PrimeCount_NumPy(n_)
+    return _PrimeCount_Python(n_)
+
+
+def _PrimeCount_Python(n: int) -> int:
+    """The pure Python implementation of `PrimeCount` for `n >= 2`.
+
+    `small[v]` holds the count for `v` and `large[i]` the count for
+    `n // i`. They start as the counts of 2..v and, for each prime `p` in
+    turn, lose the integers whose least prime factor is `p`.
+    """
+    import math
+    r = math.isqrt(n)
+    small = [max(v - 1, 0) for v in range(r + 1)]
+    large = [0] + [n // i - 1 for i in range(1, r + 1)]
+    for sp, p in enumerate(_GetBasePrimes(r)):
+        square = p * p
+        # Updating large[i] for n // i >= p * p...
+        lim = min(r, n // square)
+        mid = min(lim, r // p)
+        large[1:mid + 1] = [
+            x - large[i * p] + sp
+            for i, x in zip(range(1, mid + 1), large[1:mid + 1])]
+        large[mid + 1:lim + 1] = [
+            x - small[n // (i * p)] + sp
+            for i, x in zip(range(mid + 1, lim + 1), large[mid + 1:lim + 1])]
+        # Updating small[v] for v >= p * p...
+        if square <= r:
+            small[square:] = [
+                x - small[v // p] + sp
+                for v, x in zip(range(square, r + 1), small[square:])]
+    return large[1]
+
+
+def _PrimeCount_NumPy(n: int) -> int:
+    """The NumPy implementation of `PrimeCount` for `2 <= n < 2 ** 62`. It
+    follows `_PrimeCount_Python` with whole-array updates.
+    """
+    import math
+    import numpy as np
+    r = math.isqrt(n)
+    small = np.arange(-1, r, dtype=np.int64)
+    small[0] = 0
+    large = np.zeros(r + 1, dtype=np.int64)
+    large[1:] = n // np.arange(1, r + 1, dtype=np.int64) - 1
+    for sp, p in enumerate(_GetBasePrimes(r)):
+        square = p * p
+        # Updating large[i] for n // i >= p * p...
+        lim = min(r, n // square)
+        mid = min(lim, r // p)
+        large[1:mid + 1] -= large[p:mid * p + 1:p] - sp
+        if lim > mid:
+            idx = np.arange(mid + 1, lim + 1, dtype=np.int64) * p
+            large[mid + 1:lim + 1] -= small[n // idx] - sp
+        # Updating small[v] for v >= p * p, v // p runs over p, p + 1, ...
+        # each repeated p times...
+        if square <= r:
+            small[square:] -= \
+                np.repeat(small[p:r // p + 1], p)[:r + 1 - square] - sp
+    return int(large[1])
+
+
+def NthPrime(k: int) -> int:
+    """Returns the `k`-th prime number, with `NthPrime(1) == 2`. The prime
+    counting function places an estimate of the answer, and the gap is
+    sieved forward or backward between the proven bounds of Rosser and
+    Dusart.
+
+    #### Exceptions:
+    * `TypeError`: the argument is not a whole number.
+    * `ValueError`: the argument is not positive.
+    """
+    import math
+    # Checking the argument...
+    k_ = _AssertWholeNum(k)
+    if k_ < 1:
+        raise ValueError(f'a positive ordinal is required not {k_}')
+    if k_ < 6:
+        return (2, 3, 5, 7, 11,)[k_ - 1]
+    # Estimating the k-th prime...
+    lnK = math.log(k_)
+    lnLnK = math.log(lnK)
+    lower = int(k_ * (lnK + lnLnK - 1))
+    upper = int(k_ * (lnK + lnLnK)) + 1
+    guess = int(k_ * (lnK + lnLnK - 1 + (lnLnK - 2) / lnK))
+    guess = min(max(guess, lower), upper)
+    count = PrimeCount(guess)
+    basePrimes = _GetBasePrimes(math.isqrt(upper))
+    if count < k_:
+        # Sieving forward from the guess...
+        for low, segment in _SieveSegments(guess + 1, upper + 1, basePrimes):
+            nPrimes = segment.count(1)
+            if count + nPrimes >= k_:
+                primes = compress(
+                    range(low, low + 2 * len(segment), 2),
+                    segment)
+                return next(islice(primes, k_ - count - 1, None))
+            count += nPrimes
+    else:
+        # Sieving backward from the guess, p_k is the (count - k + 1)-th
+        # prime from the top...
+        high = guess + 1
+        while high > lower:
+            low = max(lower, high - 2 * _SEGMENT_SIZE)
+            primes = list(_IterSegmentPrimes(low, high, basePrimes))
+            if count - len(primes) < k_:
+                return primes[k_ - count - 1]
+            count -= len(primes)
+            high = low
+    raise RuntimeError(f'the {k_}-th prime was not found between {lower} '
+        f'and {upper}')
+
+
+def UsePrimeTable(table: 'PrimeTable | str | PathLike | None') -> None:
+    """Registers a prime table, either a `PrimeTable` object or the path
+    to a table file, which `GetPrimeNums` reads from whenever the table
+    covers the requested limit. Passing `None` unregisters the current
+    table. Without a call to this function, the table at the path in the
+    `PRIME_TABLE` environment variable, if any, is used.
+    """
+    global _primeTable
+    global _primeTableLoaded
+    from prime_table import PrimeTable
+    if table is not None and not isinstance(table, PrimeTable):
+        table = PrimeTable(table)
+    _primeTable = table
+    _primeTableLoaded = True
+
+
+def _GetPrimeTable() -> 'PrimeTable | None':
+    """Returns the registered prime table or `None` if there is not any."""
+    global _primeTable
+    global _primeTableLoaded
+    if not _primeTableLoaded:
+        import os
+        _primeTableLoaded = True
+        path = os.environ.get('PRIME_TABLE')
+        if path:
+            from prime_table import PrimeTable
+            _primeTable = PrimeTable(path)
+    return _primeTable
+
+
+def _AssertPrimeLimit(n: int) -> int:
+    """Checks a bound for computing prime numbers and returns it as an
+    `int`.
+
+    #### Exceptions:
+    * `TypeError`: the argument is not a whole number.
+    * `ValueError`: the number is not greater than one.
+    """
+    n_ = _AssertWholeNum(n)
+    if n_ <= 1:
+        raise ValueError('for computing prime numbers an integer greater '
+            f'than one is required not {n_}')
+    return n_
+
+
+def _AssertWholeNum(n: int) -> int:
+    """Checks that the argument is a whole number and returns it as an
+    `int`, otherwise it raises a `TypeError`.
+    """
     badType = False
     try:
         n_ = int(n)
@@ -25,37 +368,88 @@ def GetPrimeNums(n: int) -> Generator[int, None, None]:
     if badType:
         raise TypeError('a whole number is required for computing prime '
             f'numbers not a {n.__class__.__qualname__}')
-    if n_ <= 1:
-        raise ValueError('for computing prime numbers an integer greater '
-            f'than one is required not {n_}')
-    # Computing primes...
+    return n_
+
+
+def _GetBasePrimes(n: int) -> list[int]:
+    """Returns the list of all prime numbers less than or equal to `n`
+    by a plain (unsegmented) Sieve of Eratosthenes. It is meant for small
+    bounds such as the square root of a sieving limit.
+    """
+    import math
+    if n < 2:
+        return []
+    sieve = bytearray([1]) * (n + 1)
+    sieve[0] = sieve[1] = 0
+    for p in range(2, math.isqrt(n) + 1):
+        if sieve[p]:
+            sieve[p * p::p] = bytes((n - p * p) // p + 1)
+    return list(compress(range(n + 1), sieve))
+
+
+def _SieveSegments(
+        start: int,
+        stop: int,
+        basePrimes: list[int] | None = None,
+        segmentSize: int = _SEGMENT_SIZE,
+        ) -> Generator[tuple[int, bytearray], None, None]:
+    """Sieves odd numbers in the half-open interval `[start, stop)` block
+    by block and yields `(low, segment)` tuples in which `segment[i]` is
+    non-zero if and only if `low + 2 * i` is an odd prime. `low` is always
+    odd. Every block spans at most `segmentSize` odd numbers so that it
+    stays in the CPU cache while it is being crossed off.
+
+    `basePrimes` must contain all primes up to `isqrt(stop - 1)` if it
+    is provided, otherwise they are computed.
+    """
     import math
-    primes = [2,]
-    yield 2
-    if n_ >= 3:
-        primes.append(3)
-        yield 3
-    if n_ <= 4:
+    low = max(start, 3) | 1
+    if low >= stop:
         return
-    m = 5
-    while m <= n_:
-        sqrt = math.isqrt(m)
-        isPrime = True
-        for p in primes:
-            if p > sqrt:
-                break
-            if m % p == 0:
-                isPrime = False
+    if basePrimes is None:
+        basePrimes = _GetBasePrimes(math.isqrt(stop - 1))
+    zeros = memoryview(bytes(segmentSize))
+    while low < stop:
+        size = min(segmentSize, (stop - low + 1) // 2)
+        high = low + 2 * size
+        segment = bytearray([1]) * size
+        for p in basePrimes:
+            if p == 2:
+                continue
+            square = p * p
+            if square >= high:
                 break
-        if isPrime:
-            primes.append(m)
-            yield m
-        m += 1
+            # Finding the first odd multiple of p in this block...
+            first = max(square, -(-low // p) * p)
+            if not first & 1:
+                first += p
+            idx = (first - low) >> 1
+            if idx < size:
+                segment[idx::p] = zeros[:(size - 1 - idx) // p + 1]
+        if low == 1:
+            # 1 is not a prime...
+            segment[0] = 0
+        yield low, segment
+        low = high
+
+
+def _IterSegmentPrimes(
+        start: int,
+        stop: int,
+        basePrimes: list[int] | None = None,
+        ) -> Generator[int, None, None]:
+    """Yields all prime numbers in the half-open interval `[start, stop)`
+    in ascending order using the segmented sieve.
+    """
+    if start <= 2 < stop:
+        yield 2
+    for low, segment in _SieveSegments(start, stop, basePrimes):
+        yield from compress(range(low, low + 2 * len(segment), 2), segment)
 
 
 def main() -> None:
     import math
-    from math_m2.Algebra.prime_nums import GetPrimeNums
+    from math_m2.Algebra.prime_nums import GetPrimeNums, PrimeCount
     while True:
         try:
             n = int(input('Prime numbers up to (ctrl+C to exit): '))
@@ -65,11 +459,10 @@ def main() -> None:
         except KeyboardInterrupt:
             return
         try:
-            primes = list(GetPrimeNums(n))
-            nPrimes = len(primes)
+            nPrimes = PrimeCount(n)
             nDigits = math.floor(math.log10(nPrimes) + 1)
-            for idx in range(nPrimes):
-                print(f'{(idx + 1):>{nDigits}}: {primes[idx]}')
+            for idx, prime in enumerate(GetPrimeNums(n), start=1):
+                print(f'{idx:>{nDigits}}: {prime}')
         except KeyboardInterrupt:
             return
 
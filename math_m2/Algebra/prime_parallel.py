@@ -0,0 +1,90 @@
+#
+# 
+#
+
+
+from array import array
+from typing import Generator
+
+
+_BLOCKS_PER_WORKER = 2
+"""The number of blocks per worker that are submitted ahead of the one
+being yielded, so that the workers never wait for the consumer and the
+finished buffers do not pile up in memory.
+"""
+
+# Global variables of worker processes...
+_inverses: list[tuple[int, int]]
+
+
+def GetPrimeNumsParallel(
+        n: int,
+        workers: int | None = None,
+        ) -> Generator[int, None, None]:
+    """Yields all prime numbers less than or equal to `n` by sieving
+    disjoint blocks of the range in `workers` processes. If `workers` is
+    `None`, all CPU cores are used. Every worker sieves a block as a
+    mod-30 wheel bitmap and decodes it into an `array('Q')` of its primes,
+    so the parent only streams finished buffers in ascending order.
+
+    #### Exceptions:
+    * `TypeError`: the argument is not a whole number.
+    * `ValueError`: the number is not greater than one.
+    """
+    from collections import deque
+    from concurrent.futures import Future, ProcessPoolExecutor
+    import math
+    import os
+    from prime_nums import _AssertPrimeLimit
+    from prime_table import _BLOCK_SIZE
+    n_ = _AssertPrimeLimit(n)
+    nBytes = n_ // 30 + 1
+    nWorkers = workers or os.cpu_count() or 1
+    pPool = ProcessPoolExecutor(
+        max_workers=nWorkers,
+        initializer=_InitSieveProc,
+        initargs=(math.isqrt(30 * nBytes),))
+    try:
+        blocks = iter(range(0, nBytes, _BLOCK_SIZE))
+        futures: deque[Future] = deque()
+        for kLow in blocks:
+            futures.append(pPool.submit(
+                _SieveBlock_Proc,
+                kLow,
+                min(kLow + _BLOCK_SIZE, nBytes),
+                n_))
+            if len(futures) >= _BLOCKS_PER_WORKER * nWorkers:
+                break
+        for p in (2, 3, 5,):
+            if p <= n_:
+                yield p
+        while futures:
+            primes = futures.popleft().result()
+            kLow = next(blocks, None)
+            if kLow is not None:
+                futures.append(pPool.submit(
+                    _SieveBlock_Proc,
+                    kLow,
+                    min(kLow + _BLOCK_SIZE, nBytes),
+                    n_))
+            yield from primes
+    finally:
+        pPool.shutdown(cancel_futures=True)
+
+
+def _InitSieveProc(sqrt: int) -> None:
+    global _inverses
+    from prime_nums import _GetBasePrimes
+    from prime_table import _GetWheelInverses
+    _inverses = _GetWheelInverses(_GetBasePrimes(sqrt))
+
+
+def _SieveBlock_Proc(kLow: int, kHigh: int, n: int) -> array:
+    global _inverses
+    from bisect import bisect_right
+    from prime_table import _DecodeWheelBlock, _SieveWheelBlock
+    primes = _DecodeWheelBlock(
+        _SieveWheelBlock(kLow, kHigh, _inverses),
+        kLow)
+    del primes[bisect_right(primes, n):]
+    return array('Q', primes)
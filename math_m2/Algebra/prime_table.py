@@ -0,0 +1,327 @@
+#
+# 
+#
+
+
+from os import PathLike
+from typing import Generator
+
+
+_MAGIC = b'PRIMEW30'
+"""The signature at the start of every prime table file."""
+
+_HEADER_SIZE = 16
+"""The size of the header of a prime table file: the 8-byte signature and
+the covered limit as a little-endian unsigned 64-bit integer.
+"""
+
+_WHEEL: tuple[int, ...] = (1, 7, 11, 13, 17, 19, 23, 29,)
+"""The residues modulo 30 which are coprime to 30. Bit `j` of the byte `k`
+of a table stands for the integer `30 * k + _WHEEL[j]`.
+"""
+
+_WHEEL_INDEX: dict[int, int] = {r: j for j, r in enumerate(_WHEEL)}
+"""A mapping from the residues of the wheel to their bit positions."""
+
+_BIT_TABLES: tuple[bytes, ...] = tuple(
+    bytes([0, 1 << j]) + bytes(254)
+    for j in range(8))
+"""Translation tables which turn a 0/1 flag into the `j`-th bit of a
+wheel byte.
+"""
+
+_FLAG_TABLES: tuple[bytes, ...] = tuple(
+    bytes((b >> j) & 1 for b in range(256))
+    for j in range(8))
+"""Translation tables which extract the `j`-th bit of a wheel byte as a
+0/1 flag.
+"""
+
+_DECODE_SIZE = 1 << 12
+"""The number of wheel bytes that are decoded against `_OFFSETS` at
+once.
+"""
+
+_OFFSETS: tuple[int, ...] = tuple(
+    30 * (idx >> 3) + _WHEEL[idx & 7]
+    for idx in range(8 * _DECODE_SIZE))
+"""The offsets of the integers that the bits of `_DECODE_SIZE` wheel
+bytes stand for, from the start of the first byte, bit by bit.
+"""
+
+_BLOCK_SIZE = 1 << 18
+"""The number of wheel bytes (30 integers each) that are sieved or
+unpacked in one block.
+"""
+
+
+def _GetWheelInverses(basePrimes: list[int]) -> list[tuple[int, int]]:
+    """Returns `(p, inverse of 30 modulo p)` pairs for the base primes
+    that are coprime to 30.
+    """
+    return [(p, pow(30, -1, p)) for p in basePrimes if p > 5]
+
+
+def _SieveWheelBlock(
+        kLow: int,
+        kHigh: int,
+        inverses: list[tuple[int, int]],
+        ) -> bytes:
+    """Sieves the integers in `[30 * kLow, 30 * kHigh)` and returns them as
+    wheel bytes, one byte for every 30 integers. `inverses` must be the
+    output of `_GetWheelInverses` for all primes up to
+    `isqrt(30 * kHigh)`.
+
+    Each of the eight residue classes is crossed off in its own flag
+    array, because the multiples of `p` in a class are `p` bytes apart.
+    The classes are then merged into bits with big integer ORs.
+    """
+    size = kHigh - kLow
+    zeros = memoryview(bytes(size))
+    packed = 0
+    for j, r in enumerate(_WHEEL):
+        flags = bytearray([1]) * size
+        top = 30 * (kHigh - 1) + r
+        for p, inv in inverses:
+            square = p * p
+            if square > top:
+                break
+            # Finding the first k >= kLow such that 30k + r is a multiple
+            # of p not less than p squared...
+            kMin = max(kLow, -(-(square - r) // 30))
+            kFirst = kMin + (-r * inv - kMin) % p
+            idx = kFirst - kLow
+            if idx < size:
+                flags[idx::p] = zeros[:(size - 1 - idx) // p + 1]
+        packed |= int.from_bytes(flags.translate(_BIT_TABLES[j]), 'little')
+    if kLow == 0:
+        # 1 is not a prime...
+        packed &= ~1
+    return packed.to_bytes(size, 'little')
+
+
+def _DecodeWheelBlock(data: bytes, kLow: int) -> list[int]:
+    """Returns the ascending list of the primes flagged in `data`, wheel
+    bytes which begin at the byte `kLow`. The bits are spread into one
+    flag per candidate, which selects the offsets of `_OFFSETS` run by
+    run, so that only the primes are turned into new integers.
+    """
+    from itertools import compress, repeat
+    from operator import add
+    flags = bytearray(8 * len(data))
+    for j in range(8):
+        flags[j::8] = data.translate(_FLAG_TABLES[j])
+    primes: list[int] = []
+    for k in range(0, len(data), _DECODE_SIZE):
+        primes.extend(map(
+            add,
+            repeat(30 * (kLow + k)),
+            compress(_OFFSETS, flags[8 * k:8 * (k + _DECODE_SIZE)])))
+    return primes
+
+
+def _IterWheelPrimes(
+        data: bytes,
+        kLow: int,
+        start: int,
+        stop: int,
+        ) -> Generator[int, None, None]:
+    """Yields the primes in `[start, stop)` that are flagged in `data`,
+    wheel bytes which begin at the byte `kLow`. The primes 2, 3 and 5 are
+    not represented by wheel bytes and are never yielded.
+    """
+    from bisect import bisect_left
+    from itertools import islice
+    primes = _DecodeWheelBlock(data, kLow)
+    yield from islice(
+        primes,
+        bisect_left(primes, start),
+        bisect_left(primes, stop))
+
+
+class PrimeTable:
+    """A read-only, memory-mapped table of primes stored as a mod-30 wheel
+    bitmap, so that 30 integers occupy one byte. A table is built once by
+    `PrimeTable.Build` and can then be opened by any number of processes
+    which share the pages of the file through the OS cache.
+    """
+
+    def __init__(self, path: str | PathLike) -> None:
+        """Opens the prime table at `path`.
+
+        #### Exceptions:
+        * `OSError`: the file cannot be opened or mapped.
+        * `ValueError`: the file is not a prime table.
+        """
+        import mmap
+        import struct
+        with open(path, mode='rb') as fileobj:
+            self._mm = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < _HEADER_SIZE or \
+                self._mm[:len(_MAGIC)] != _MAGIC:
+            self._mm.close()
+            raise ValueError(f"'{path}' is not a prime table")
+        self._limit: int = struct.unpack_from('<Q', self._mm, len(_MAGIC))[0]
+        self._path = path
+
+    @classmethod
+    def Build(cls, path: str | PathLike, limit: int) -> 'PrimeTable':
+        """Builds a prime table covering at least all integers up to `limit`
+        at `path`, overwrites it if it exists, and returns it opened. The
+        covered limit is rounded up to the end of the last wheel byte.
+
+        #### Exceptions:
+        * `TypeError`: the limit is not a whole number.
+        * `ValueError`: the limit is not greater than one.
+        """
+        import math
+        import struct
+        from prime_nums import _AssertPrimeLimit, _GetBasePrimes
+        limit = _AssertPrimeLimit(limit)
+        nBytes = limit // 30 + 1
+        inverses = _GetWheelInverses(_GetBasePrimes(math.isqrt(30 * nBytes)))
+        with open(path, mode='wb') as fileobj:
+            fileobj.write(_MAGIC)
+            fileobj.write(struct.pack('<Q', 30 * nBytes - 1))
+            for kLow in range(0, nBytes, _BLOCK_SIZE):
+                kHigh = min(kLow + _BLOCK_SIZE, nBytes)
+                fileobj.write(_SieveWheelBlock(kLow, kHigh, inverses))
+        return cls(path)
+
+    @property
+    def limit(self) -> int:
+        """The greatest integer that this table covers."""
+        return self._limit
+
+    @property
+    def path(self) -> str | PathLike:
+        """The path to the file of this table."""
+        return self._path
+
+    def close(self) -> None:
+        """Unmaps the table. Querying a closed table is an error."""
+        self._mm.close()
+
+    def __enter__(self) -> 'PrimeTable':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def Covers(self, n: int) -> bool:
+        """Determines whether this table covers `n` or not."""
+        return n <= self._limit
+
+    def IsPrime(self, n: int) -> bool:
+        """Determines whether `n` is a prime number or not.
+
+        #### Exceptions:
+        * `ValueError`: `n` is beyond the limit of this table.
+        """
+        if n > self._limit:
+            raise ValueError(f'{n} is beyond the limit of the prime '
+                f'table which is {self._limit}')
+        if n < 7:
+            return n in (2, 3, 5,)
+        k, r = divmod(n, 30)
+        try:
+            j = _WHEEL_INDEX[r]
+        except KeyError:
+            return False
+        return bool((self._mm[_HEADER_SIZE + k] >> j) & 1)
+
+    def GetPrimes(self, n: int) -> Generator[int, None, None]:
+        """Yields all prime numbers less than or equal to `n`.
+
+        #### Exceptions:
+        * `ValueError`: `n` is beyond the limit of this table.
+        """
+        return self.GetPrimesInRange(2, n)
+
+    def GetPrimeArray(self, n: int) -> 'numpy.ndarray | array[int]':
+        """Returns all prime numbers less than or equal to `n` in one
+        buffer like `GetPrimeArray` of `prime_nums`. With NumPy, the
+        wheel bytes are unpacked into bits and their indices are turned
+        into primes by whole-array operations.
+
+        #### Exceptions:
+        * `ValueError`: `n` is beyond the limit of this table.
+        """
+        if n > self._limit:
+            raise ValueError(f'{n} is beyond the limit of the prime '
+                f'table which is {self._limit}')
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        if numpy is None:
+            from array import array
+            return array('Q', self._IterPrimes(2, n + 1))
+        return self._GetPrimeArray_NumPy(n)
+
+    def GetPrimesInRange(
+            self,
+            a: int,
+            b: int,
+            ) -> Generator[int, None, None]:
+        """Yields all prime numbers in the closed interval `[a, b]`.
+
+        #### Exceptions:
+        * `ValueError`: `b` is beyond the limit of this table.
+        """
+        if b > self._limit:
+            raise ValueError(f'{b} is beyond the limit of the prime '
+                f'table which is {self._limit}')
+        return self._IterPrimes(a, b + 1)
+
+    def _GetPrimeArray_NumPy(self, n: int) -> 'numpy.ndarray':
+        import numpy as np
+        wheel = np.array(_WHEEL, dtype=np.int64)
+        chunks = [np.array([p for p in (2, 3, 5,) if p <= n], dtype=np.int64)]
+        kStop = n // 30 + 1
+        for kLow in range(0, kStop, _BLOCK_SIZE):
+            kHigh = min(kLow + _BLOCK_SIZE, kStop)
+            bits = np.unpackbits(
+                np.frombuffer(
+                    self._mm,
+                    dtype=np.uint8,
+                    count=kHigh - kLow,
+                    offset=_HEADER_SIZE + kLow),
+                bitorder='little')
+            idx = np.flatnonzero(bits)
+            chunks.append(30 * (kLow + (idx >> 3)) + wheel[idx & 7])
+        primes = np.concatenate(chunks)
+        return primes[:np.searchsorted(primes, n, side='right')]
+
+    def _IterPrimes(self, start: int, stop: int) -> Generator[int, None, None]:
+        for p in (2, 3, 5,):
+            if start <= p < stop:
+                yield p
+        kLow = max(start, 0) // 30
+        kStop = (stop + 29) // 30
+        while kLow < kStop:
+            kHigh = min(kLow + _BLOCK_SIZE, kStop)
+            yield from _IterWheelPrimes(
+                self._mm[_HEADER_SIZE + kLow:_HEADER_SIZE + kHigh],
+                kLow,
+                start,
+                stop)
+            kLow = kHigh
+
+
+def main() -> None:
+    from time import perf_counter
+    path = input('Path of the prime table: ')
+    try:
+        n = int(input('Prime numbers up to: '))
+    except ValueError:
+        print('Invalid input')
+        return
+    startTime = perf_counter()
+    with PrimeTable.Build(path, n) as table:
+        print(f'Built a table up to {table.limit} in '
+            f'{perf_counter() - startTime:.2f} seconds')
+
+
+if __name__ == '__main__':
+    main()
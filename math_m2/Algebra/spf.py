@@ -0,0 +1,131 @@
+#
+# 
+#
+
+
+from array import array
+from collections import defaultdict
+from os import PathLike
+
+
+_MAGIC = b'SPFTABLE'
+"""The signature at the start of every smallest-prime-factor table file."""
+
+_HEADER_SIZE = 16
+"""The size of the header of a table file: the 8-byte signature and the
+limit as a little-endian unsigned 64-bit integer.
+"""
+
+_MAX_LIMIT = (1 << 32) - 1
+"""The greatest limit of a table, because the entries are 32-bit."""
+
+
+class SpfTable:
+    """A table of the smallest prime factor of every integer up to a
+    limit, stored in a compact `array('I')` in memory or memory-mapped
+    from a file. An entry is zero for primes, so only the multiples of
+    the primes up to the square root of the limit are ever written, and
+    every integer of the table is factored in O(log n) steps.
+    """
+
+    def __init__(self, spf: 'array[int] | memoryview', limit: int) -> None:
+        """Wraps the entries of a table. Use `SpfTable.Build` or
+        `SpfTable.Open` instead.
+        """
+        self._spf = spf
+        self._limit = limit
+        self._mm = None
+
+    @classmethod
+    def Build(
+            cls,
+            limit: int,
+            path: str | PathLike | None = None,
+            ) -> 'SpfTable':
+        """Builds the table of all integers up to `limit`. If `path` is
+        provided, the table is also written there and returned
+        memory-mapped from the file.
+
+        #### Exceptions:
+        * `TypeError`: the limit is not a whole number.
+        * `ValueError`: the limit is not greater than one or does not fit
+        in 32 bits.
+        """
+        import math
+        from prime_nums import _AssertPrimeLimit, _GetBasePrimes
+        limit = _AssertPrimeLimit(limit)
+        if limit > _MAX_LIMIT:
+            raise ValueError('the limit of a smallest-prime-factor table '
+                f'must be less than 2^32 not {limit}')
+        spf = array('I', bytes(4 * (limit + 1)))
+        # Crossing off by the greatest primes first so that the smallest
+        # prime factor is written last...
+        for p in reversed(_GetBasePrimes(math.isqrt(limit))):
+            square = p * p
+            spf[square::p] = array('I', [p]) * ((limit - square) // p + 1)
+        if path is None:
+            return cls(spf, limit)
+        import struct
+        with open(path, mode='wb') as fileobj:
+            fileobj.write(_MAGIC)
+            fileobj.write(struct.pack('<Q', limit))
+            spf.tofile(fileobj)
+        return cls.Open(path)
+
+    @classmethod
+    def Open(cls, path: str | PathLike) -> 'SpfTable':
+        """Opens the table at `path` memory-mapped.
+
+        #### Exceptions:
+        * `OSError`: the file cannot be opened or mapped.
+        * `ValueError`: the file is not a smallest-prime-factor table.
+        """
+        import mmap
+        import struct
+        with open(path, mode='rb') as fileobj:
+            mm = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(mm) < _HEADER_SIZE or mm[:len(_MAGIC)] != _MAGIC:
+            mm.close()
+            raise ValueError(f"'{path}' is not a smallest-prime-factor table")
+        limit = struct.unpack_from('<Q', mm, len(_MAGIC))[0]
+        table = cls(memoryview(mm)[_HEADER_SIZE:].cast('I'), limit)
+        table._mm = mm
+        return table
+
+    @property
+    def limit(self) -> int:
+        """The greatest integer that this table covers."""
+        return self._limit
+
+    def close(self) -> None:
+        """Releases the file of a memory-mapped table."""
+        if self._mm is not None:
+            self._spf.release()
+            self._mm.close()
+            self._mm = None
+
+    def __enter__(self) -> 'SpfTable':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def Covers(self, n: int) -> bool:
+        """Determines whether this table covers `n` or not."""
+        return n <= self._limit
+
+    def GetSpf(self, n: int) -> int:
+        """Returns the smallest prime factor of `2 <= n <= limit`."""
+        return self._spf[n] or n
+
+    def Factor(self, n: int) -> dict[int, int]:
+        """Decomposes `2 <= n <= limit` into prime factors like
+        `GetPrimeFactors`.
+        """
+        spf = self._spf
+        factors: dict[int, int] = defaultdict(int)
+        while n > 1:
+            p = spf[n] or n
+            factors[p] += 1
+            n //= p
+        return factors
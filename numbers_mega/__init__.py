@@ -3,19 +3,86 @@
 #
 
 
-from typing import Any
+from typing import Any, Iterable
+
+
+_INT_TYPECODES = frozenset('bBhHiIlLqQ')
+"""The type codes of `array.array` whose elements are all integers."""
+
+_NONE = object()
+"""A sentinel for the end of an iterator."""
 
 
 def AssertInt(val: Any) -> None:
     """Asserts that the argument is an integer or a numeric whole number,
     otherwise it raises a `TypeError`.
     """
-    badType = False
+    if not _IsWholeNum(val):
+        raise TypeError(f"'{val}' is not an integer or a whole number.")
+
+
+def AssertInts(seq: Iterable[Any]) -> None:
+    """Asserts that every element of `seq` is an integer or a numeric
+    whole number like `AssertInt`, otherwise it raises a `TypeError` for
+    the first offending element along with its index. Buffers of integer
+    type, such as NumPy integer arrays, `array.array` of integer codes,
+    `bytes` and `range`, are accepted without looking at the elements.
+    NumPy float arrays are checked by whole-array operations, and other
+    iterables in one pass which stops at the first offending element.
+    """
+    import sys
+    from array import array
+    # Accepting integer buffers by their types...
+    if isinstance(seq, (bytes, bytearray, range,)):
+        return
+    if isinstance(seq, array):
+        if seq.typecode in _INT_TYPECODES:
+            return
+    elif isinstance(seq, memoryview):
+        if seq.format.lstrip('@=<>!') in _INT_TYPECODES:
+            return
+        if seq.ndim > 1:
+            # Flattening, because multi-dimensional views cannot be
+            # iterated, so the indices are the flat ones like NumPy's...
+            from itertools import chain
+            flat = seq.tolist()
+            for _ in range(seq.ndim - 1):
+                flat = chain.from_iterable(flat)
+            seq = flat
+    elif isinstance(seq, (list, tuple,)):
+        # Skipping to the first element which is not an int at C speed...
+        from itertools import filterfalse
+        if next(filterfalse(int.__instancecheck__, seq), _NONE) is _NONE:
+            return
+    else:
+        # An ndarray exists only if NumPy has been imported...
+        numpy = sys.modules.get('numpy')
+        if numpy is not None and isinstance(seq, numpy.ndarray):
+            match seq.dtype.kind:
+                case 'i' | 'u' | 'b':
+                    return
+                case 'f':
+                    flat = seq.ravel()
+                    bad = ~numpy.isfinite(flat)
+                    bad |= flat != numpy.trunc(flat)
+                    if bad.any():
+                        idx = int(bad.argmax())
+                        _RaiseAt(flat[idx], idx)
+                    return
+    # Checking the elements one by one...
+    for idx, val in enumerate(seq):
+        if type(val) is not int and not _IsWholeNum(val):
+            _RaiseAt(val, idx)
+
+
+def _IsWholeNum(val: Any) -> bool:
     try:
         n = int(val)
-    except TypeError:
-        badType = True
-    if n != val:
-        badType = True
-    if badType:
-        raise TypeError(f"'{val}' is not an integer or a whole number.")
+    except (TypeError, ValueError, OverflowError,):
+        return False
+    return n == val
+
+
+def _RaiseAt(val: Any, idx: int) -> None:
+    raise TypeError(f"'{val}' at index {idx} is not an integer or a whole "
+        "number.")
@@ -2,6 +2,9 @@
 # 
 #
 
+from typing import Generator, Iterable, Literal, TextIO
+
+
 _SUPER: dict[str, str] = {
     '0': '\u2070',
     '1': '\u00b9',
@@ -12,9 +15,50 @@ _SUPER: dict[str, str] = {
     '6': '\u2076',
     '7': '\u2077',
     '8': '\u2078',
-    '9': '\u2079',}
-"""A mapping from unicode character of regular decimal digits to
-unicode character of their superscript representations.
+    '9': '\u2079',
+    '+': '\u207a',
+    '-': '\u207b',
+    '=': '\u207c',
+    '(': '\u207d',
+    ')': '\u207e',}
+"""A mapping from unicode character of regular decimal digits, signs and
+parentheses to unicode character of their superscript representations.
+"""
+
+_SUB: dict[str, str] = {
+    '0': '\u2080',
+    '1': '\u2081',
+    '2': '\u2082',
+    '3': '\u2083',
+    '4': '\u2084',
+    '5': '\u2085',
+    '6': '\u2086',
+    '7': '\u2087',
+    '8': '\u2088',
+    '9': '\u2089',
+    '+': '\u208a',
+    '-': '\u208b',
+    '=': '\u208c',
+    '(': '\u208d',
+    ')': '\u208e',}
+"""A mapping from unicode character of regular decimal digits, signs and
+parentheses to unicode character of their subscript representations.
+"""
+
+_TABLES: dict[str, dict[int, str]] = {
+    'super': str.maketrans(_SUPER),
+    'sub': str.maketrans(_SUB),
+    'normal': str.maketrans({
+        **{sup: char for char, sup in _SUPER.items()},
+        **{sub: char for char, sub in _SUB.items()},}),}
+"""The translation tables of the modes of `Transcode`, built once:
+regular characters to superscripts, regular characters to subscripts,
+and both superscripts and subscripts back to regular characters.
+"""
+
+_CHUNK_SIZE = 1 << 16
+"""The default number of characters that the streaming functions read
+and translate at once.
 """
 
 
@@ -22,17 +66,117 @@ def GetSuperNum(num: str) -> str:
     """This function receives a string of a decimal number and
     returns the superscript representation of the number.
     """
-    table = num.maketrans(_SUPER)
-    return num.translate(table)
+    return num.translate(_TABLES['super'])
+
+
+def GetSubNum(num: str) -> str:
+    """This function receives a string of a decimal number and
+    returns the subscript representation of the number.
+    """
+    return num.translate(_TABLES['sub'])
+
+
+def Transcode(
+        text: str,
+        mode: Literal['super', 'sub', 'normal'],
+        ) -> str:
+    """Translates the digits, signs and parentheses of `text` to
+    superscripts (`'super'`), to subscripts (`'sub'`) or from both of
+    them back to regular characters (`'normal'`). Other characters are
+    kept.
+
+    #### Exceptions:
+    * `ValueError`: the mode is unknown.
+    """
+    return text.translate(_GetTable(mode))
+
+
+def IterTranscode(
+        chunks: Iterable[str],
+        mode: Literal['super', 'sub', 'normal'],
+        ) -> Generator[str, None, None]:
+    """Yields the translation of every string of `chunks` like
+    `Transcode`. Every character is translated on its own, so the text
+    may be split anywhere.
+
+    #### Exceptions:
+    * `ValueError`: the mode is unknown.
+    """
+    table = _GetTable(mode)
+    for chunk in chunks:
+        yield chunk.translate(table)
+
+
+def TranscodeFile(
+        src: TextIO,
+        dst: TextIO,
+        mode: Literal['super', 'sub', 'normal'],
+        chunkSize: int = _CHUNK_SIZE,
+        ) -> int:
+    """Reads the text file object `src` in chunks of `chunkSize`
+    characters, writes their translation like `Transcode` to `dst` and
+    returns the number of characters. The memory does not grow with the
+    size of the file.
+
+    #### Exceptions:
+    * `ValueError`: the mode is unknown or the chunk size is not
+    positive.
+    """
+    if chunkSize < 1:
+        raise ValueError(f'a positive chunk size is required not {chunkSize}')
+    table = _GetTable(mode)
+    nChars = 0
+    while True:
+        chunk = src.read(chunkSize)
+        if not chunk:
+            break
+        dst.write(chunk.translate(table))
+        nChars += len(chunk)
+    return nChars
+
+
+def _GetTable(mode: str) -> dict[int, str]:
+    try:
+        return _TABLES[mode]
+    except KeyError:
+        raise ValueError(f"unknown mode '{mode}', expected one of "
+            f"{', '.join(_TABLES)}") from None
+
+
+def Benchmark() -> None:
+    """Prints the throughput of `Transcode` and `TranscodeFile` for texts
+    of growing sizes. It stays flat because the tables are built once
+    and files are read in chunks of a fixed size.
+    """
+    from io import StringIO
+    from time import perf_counter
+    unit = 'x^(2n+1) = 10-9, '
+    for size in (1 << 10, 1 << 14, 1 << 18, 1 << 22, 1 << 24,):
+        text = (unit * (size // len(unit) + 1))[:size]
+        nLoops = max(1, (1 << 24) // size)
+        startTime = perf_counter()
+        for _ in range(nLoops):
+            sup = Transcode(text, 'super')
+        superRate = size * nLoops / (perf_counter() - startTime)
+        startTime = perf_counter()
+        for _ in range(nLoops):
+            TranscodeFile(StringIO(sup), StringIO(), 'normal')
+        fileRate = size * nLoops / (perf_counter() - startTime)
+        print(f'{size:>10} chars: {superRate / 1e6:7.1f} M chars/s '
+            f'to superscripts, {fileRate / 1e6:7.1f} M chars/s back '
+            'from a file')
 
 
 def main() -> None:
+    import sys
+    if sys.argv[1:] == ['bench']:
+        Benchmark()
+        return
     while True:
         n = input('Enter a number: ')
-        table = n.maketrans(_SUPER)
-        m = n.translate(table)
+        m = GetSuperNum(n)
         print(f'{n}{m}')
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()